@@ -1,27 +1,247 @@
 """Book Assistant agent with LangGraph orchestration."""
 
+import asyncio
 import json
+import queue
+import re
+import sqlite3
+import threading
+import time
 import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator
 
 from langchain_anthropic import ChatAnthropic
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import StateGraph
 from langgraph.prebuilt import tools_condition
 from datetime import datetime
 
 from agent_tools import (
+    progress_callback,
+    retention,
+    session_id,
+    vector_store,
     googleAPI_retrieval,
     present_book_info,
     search_db,
     get_book_by_rank,
 )
 from components.book_table_renderer import BookTableRenderer
+from models.book import BookModel
+from models.chat import StreamEvent
+from models.config import AppConfig
+from services.http_client import async_client_scope
 from tools import Assistant, State, create_tool_node_with_fallback
 from utils.file_manager import FileManager
+from utils.presentation import resolve_token
 
 TOKEN_START = "<data_retrieved="
 TOKEN_END = ">"
+_TOKEN_RE = re.compile(re.escape(TOKEN_START) + r"([^>]*)" + re.escape(TOKEN_END))
+# Loads and renders the tables of one response concurrently; shared by all
+# assistants so a chat that is closed leaves no threads behind
+_TABLE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="table-render")
+
+
+class _TokenSplitter:
+    """Splits streamed text into text and token pieces, holding back partial tokens."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def _safe_length(self) -> int:
+        """Length of the buffer prefix that cannot be part of a token."""
+        start = self._buffer.find(TOKEN_START)
+        if start != -1:
+            return start
+        for size in range(min(len(TOKEN_START) - 1, len(self._buffer)), 0, -1):
+            if TOKEN_START.startswith(self._buffer[-size:]):
+                return len(self._buffer) - size
+        return len(self._buffer)
+
+    def feed(self, text: str) -> list[tuple[str, str]]:
+        """Add text; return ("text", ...) and ("token", value) pieces that are complete."""
+        self._buffer += text
+        pieces = []
+        while match := _TOKEN_RE.search(self._buffer):
+            if match.start():
+                pieces.append(("text", self._buffer[: match.start()]))
+            pieces.append(("token", match.group(1)))
+            self._buffer = self._buffer[match.end() :]
+        safe = self._safe_length()
+        if safe:
+            pieces.append(("text", self._buffer[:safe]))
+            self._buffer = self._buffer[safe:]
+        return pieces
+
+    def flush(self) -> list[tuple[str, str]]:
+        """Release held-back text (e.g. an unterminated token) at the end of an LLM turn."""
+        text, self._buffer = self._buffer, ""
+        return [("text", text)] if text else []
+
+
+def _message_text(content: Any) -> str:
+    """Text of a message content (a string or Anthropic content blocks)."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+class _ThreadedSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver whose async methods run the sync ones on worker threads.
+
+    The pinned SqliteSaver raises on every async method, and the async saver
+    needs aiosqlite. Sharing one saver keeps run() and arun() on the same
+    conversation memory.
+    """
+
+    @classmethod
+    def from_conn_string(cls, conn_string: str) -> "_ThreadedSqliteSaver":
+        return cls(conn=sqlite3.connect(conn_string, check_same_thread=False))
+
+    async def aget_tuple(self, config: RunnableConfig):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: RunnableConfig | None, **kwargs: Any):
+        for item in await asyncio.to_thread(lambda: list(self.list(config, **kwargs))):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint, metadata) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata)
+
+
+class _StreamCallbackHandler(BaseCallbackHandler):
+    """Forwards LLM text deltas and tool start/end (with timings) to an event sink."""
+
+    # Called directly on the event loop in async runs; `put` must not block
+    run_inline = True
+
+    def __init__(self, put: Callable[[tuple[str, Any]], None]) -> None:
+        self._put = put
+        self._streamed_runs: set = set()
+        self._tool_starts: dict[Any, tuple[str, float]] = {}
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs: Any) -> None:
+        if isinstance(token, str) and token:
+            self._streamed_runs.add(run_id)
+            self._put(("text", token))
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any) -> None:
+        # Models that did not stream tokens deliver the whole turn at once
+        if run_id not in self._streamed_runs:
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    text = _message_text(message.content) if message else generation.text
+                    if text:
+                        self._put(("text", text))
+        self._streamed_runs.discard(run_id)
+        self._put(("llm_end", None))
+
+    def on_tool_start(self, serialized: dict, input_str: str, *, run_id, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "Unknown tool"
+        self._tool_starts[run_id] = (name, time.perf_counter())
+        self._put(("tool_start", name))
+
+    def _tool_finished(self, run_id) -> None:
+        name, started = self._tool_starts.pop(run_id, ("Unknown tool", time.perf_counter()))
+        self._put(("tool_end", (name, time.perf_counter() - started)))
+
+    def on_tool_end(self, output: Any, *, run_id, **kwargs: Any) -> None:
+        self._tool_finished(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id, **kwargs: Any) -> None:
+        self._tool_finished(run_id)
+
+
+class _StreamAssembler:
+    """
+    Turns run events into StreamEvents for run_stream/astream.
+
+    feed() splits an event into ordered pieces and emit() turns each piece
+    into a StreamEvent (or None). Only "token" pieces block (the table is
+    loaded and rendered), so async callers can offload just those.
+
+    Text of every LLM turn is streamed, but the final "done" event carries
+    only the last turn, like the return value of run().
+    """
+
+    def __init__(self, assistant: "BookAssistant") -> None:
+        self._assistant = assistant
+        self._splitter = _TokenSplitter()
+        self._parts: list[str] = []
+        self._shown_tokens: list[str] = []
+        self._assets = assistant._renderer.assets()
+        # Where the current LLM turn starts in _parts, and whether it shows a table
+        self._turn_start = 0
+        self._turn_has_table = False
+        self._turn_ended = False
+
+    def _continue_turn(self) -> None:
+        """Start a new turn if the previous one has ended."""
+        if self._turn_ended:
+            self._turn_start = len(self._parts)
+            self._turn_has_table = False
+            self._turn_ended = False
+
+    def feed(self, kind: str, payload: Any) -> list[tuple[str, Any]]:
+        """Split one run event into pieces; re-raises a run error."""
+        if kind == "text":
+            return self._splitter.feed(payload)
+        if kind == "llm_end":
+            return self._splitter.flush() + [("separator", None)]
+        if kind == "end":
+            return self._splitter.flush() + [("done", None)]
+        if kind == "error":
+            raise payload
+        if kind == "tool_start":
+            return [("event", StreamEvent(kind="tool_start", tool=payload))]
+        if kind == "tool_end":
+            return [("event", StreamEvent(kind="tool_end", tool=payload[0], elapsed=payload[1]))]
+        if kind == "progress":
+            return [("event", StreamEvent(kind="progress", tool=payload[0], text=payload[1]))]
+        return []
+
+    def emit(self, piece: tuple[str, Any]) -> StreamEvent | None:
+        kind, value = piece
+        if kind == "event":
+            return value
+        if kind == "text":
+            self._continue_turn()
+            self._parts.append(value)
+            return StreamEvent(kind="text", text=value)
+        if kind == "separator":
+            self._turn_ended = True
+            # Separate the text of consecutive LLM turns
+            if self._parts and not self._parts[-1].endswith("\n"):
+                self._parts.append("\n\n")
+                return StreamEvent(kind="text", text="\n\n")
+            return None
+        if kind == "done":
+            response = "".join(self._parts[self._turn_start :]).strip()
+            if self._turn_has_table:
+                response = self._assets + response
+            return StreamEvent(kind="done", text=response or "No response.")
+
+        self._continue_turn()
+        assistant = self._assistant
+        unique_id = re.sub(r"\W", "_", f"{value}_{len(self._shown_tokens)}")
+        html, ok = assistant._render_token(value, unique_id)
+        self._parts.append(html)
+        if not ok:
+            return StreamEvent(kind="text", text=html)
+        self._shown_tokens.append(value)
+        self._turn_has_table = True
+        retention.hold(assistant.thread_id, [value])
+        return StreamEvent(kind="table", text=self._assets + html)
 
 
 class BookAssistant:
@@ -51,7 +271,9 @@ class BookAssistant:
                     "3. Maintain the exact format provided by the tool for tokens and place all tokens in the final response."
                     "4. Tokens are already rendered when the user sees the final response, so adjust your responses accordingly."
                     "5. Each googleAPI_retrieval call returns a unique search_id - save this to display those specific results."
-                    "6. You can show books from multiple different searches in a single response.",
+                    "6. You can show books from multiple different searches in a single response."
+                    "7. Batch lookups: pass a list of queries to search_db, and a list or range of ranks "
+                    "(e.g. '1-5') to get_book_by_rank, instead of calling them once per item.",
                 ),
                 ("placeholder", "{messages}"),
             ]
@@ -69,79 +291,237 @@ class BookAssistant:
         )
 
         builder = StateGraph(State)
-        builder.add_node("assistant", Assistant(self.part_1_assistant_runnable))
+        assistant = Assistant(self.part_1_assistant_runnable)
+        builder.add_node("assistant", RunnableLambda(assistant, afunc=assistant.acall))
         builder.add_node("tools", create_tool_node_with_fallback(self.part_1_tools))
         builder.set_entry_point("assistant")
         builder.add_conditional_edges("assistant", tools_condition)
         builder.add_edge("tools", "assistant")
 
         try:
-            memory = SqliteSaver.from_conn_string(":memory:")
+            memory = _ThreadedSqliteSaver.from_conn_string(":memory:")
         except Exception:
             raise Exception("Could not create memory database")
 
         self.part_1_graph = builder.compile(checkpointer=memory)
         self.thread_id = str(uuid.uuid4())
-        self._renderer = BookTableRenderer()
+        app_config = AppConfig()
+        self._renderer = BookTableRenderer(
+            reload=app_config.template_reload,
+            virtualize_min_rows=app_config.table_virtualize_min_rows,
+        )
         self._file_manager = FileManager()
+        # Open the persisted vector index while the user types the first question
+        vector_store.warm_up()
+        retention.start()
+        # Data shown in this chat stays until the assistant (its session) goes away
+        weakref.finalize(self, retention.release, self.thread_id)
+
+    def _render_token(self, token_value: str, unique_id: str) -> tuple[str, bool]:
+        """Load and render one token's table; returns (html or inline error, success)."""
+        try:
+            data = resolve_token(token_value, self._file_manager)
+        except FileNotFoundError:
+            return f"[Error: Token {token_value} not found]", False
+        except (json.JSONDecodeError, ValueError):
+            return f"[Error: Invalid data for token {token_value}]", False
+        books = [BookModel.from_stored(b) for b in data]
+        return self._renderer.render_block(books, unique_id), True
 
     def replace_token_with_table(self, text: str) -> str:
-        """Replace <data_retrieved=TOKEN> placeholders with rendered HTML tables."""
-        tables_html: list[str] = []
+        """
+        Replace <data_retrieved=TOKEN> placeholders with rendered HTML tables.
 
-        while True:
-            start_idx = text.find(TOKEN_START)
-            end_idx = text.find(TOKEN_END, start_idx)
+        The text is split on tokens in one pass, every table is loaded and
+        rendered concurrently, and the result is joined once. The shared CSS/JS
+        is emitted once, at the start of the response; see
+        BookTableRenderer.render_block.
+        """
+        # Odd positions hold token values, even positions the text around them
+        parts = _TOKEN_RE.split(text)
+        tokens = parts[1::2]
+        if not tokens:
+            return text
 
-            if start_idx == -1 or end_idx == -1:
-                break
+        # The same reference can be shown twice, so ids are made per table
+        unique_ids = [re.sub(r"\W", "_", f"{token}_{i}") for i, token in enumerate(tokens)]
+        if len(tokens) == 1:
+            results = [self._render_token(tokens[0], unique_ids[0])]
+        else:
+            results = list(_TABLE_POOL.map(self._render_token, tokens, unique_ids))
+        parts[1::2] = [html for html, _ in results]
 
-            token_value = text[start_idx + len(TOKEN_START) : end_idx]
-            json_filename = f"{token_value}.json"
+        rendered = [token for token, (_, ok) in zip(tokens, results) if ok]
+        if not rendered:
+            return "".join(parts)
+        retention.hold(self.thread_id, rendered)
+        return self._renderer.assets() + "".join(parts)
 
-            try:
-                data = self._file_manager.read_books_json(json_filename)
-                unique_id = token_value.replace("-", "_")
+    def run(self, question: str, status_callback=None) -> str:
+        """Process user question and return response with rendered tables.
 
-                html_table = self._renderer.render_from_dicts(
-                    books_data=data,
-                    unique_id=unique_id,
-                    include_styles=True,
-                )
-                tables_html.append(html_table)
+        Args:
+            question: User's question
+            status_callback: Optional callback function to report status updates.
+                           Should accept (tool_name: str, status: str) where status is 'start' or 'complete',
+                           and (tool_name: str, "progress", detail: str) for intermediate tool progress
+        """
+        progress_token = progress_callback.set(status_callback)
+        session_token = session_id.set(self.thread_id)
+        # Renew holds on tables already in this chat's history
+        retention.hold(self.thread_id)
+        try:
+            return self._run(question, status_callback)
+        finally:
+            session_id.reset(session_token)
+            progress_callback.reset(progress_token)
 
-                text = (
-                    text[:start_idx]
-                    + f"__TABLE_PLACEHOLDER_{len(tables_html) - 1}__"
-                    + text[end_idx + len(TOKEN_END) :]
-                )
+    def run_stream(self, question: str) -> Iterator[StreamEvent]:
+        """
+        Process a question, yielding output as soon as it is available.
 
-            except FileNotFoundError:
-                text = (
-                    text[:start_idx]
-                    + f"[Error: Token {token_value} not found]"
-                    + text[end_idx + len(TOKEN_END) :]
-                )
-            except (json.JSONDecodeError, ValueError):
-                text = (
-                    text[:start_idx]
-                    + f"[Error: Invalid data for token {token_value}]"
-                    + text[end_idx + len(TOKEN_END) :]
+        Text deltas arrive while the LLM writes. Each table is rendered as soon
+        as its token is complete, and tool calls are reported with timings. The
+        final "done" event carries the last LLM turn in the same form as run().
+        """
+        events: queue.Queue = queue.Queue()
+        handler = _StreamCallbackHandler(events.put)
+
+        def _report(tool_name: str, status: str, detail: str | None = None) -> None:
+            if status == "progress":
+                events.put(("progress", (tool_name, detail or "")))
+
+        def _worker() -> None:
+            # A new thread starts with default context values, so scope them here
+            progress_callback.set(_report)
+            session_id.set(self.thread_id)
+            try:
+                self.part_1_graph.invoke(
+                    {"messages": ("user", question)},
+                    {"configurable": {"thread_id": self.thread_id}, "callbacks": [handler]},
                 )
+            except Exception as e:
+                events.put(("error", e))
+            finally:
+                events.put(("end", None))
 
-        for i, table_html in enumerate(tables_html):
-            text = text.replace(f"__TABLE_PLACEHOLDER_{i}__", table_html)
+        # Renew holds on tables already in this chat's history
+        retention.hold(self.thread_id)
+        threading.Thread(target=_worker, name="assistant-run", daemon=True).start()
 
-        return text
+        assembler = _StreamAssembler(self)
+        while True:
+            kind, payload = events.get()
+            for piece in assembler.feed(kind, payload):
+                event = assembler.emit(piece)
+                if event is not None:
+                    yield event
+            if kind == "end":
+                break
 
-    def run(self, question: str, status_callback=None) -> str:
-        """Process user question and return response with rendered tables.
+    async def arun(self, question: str, status_callback=None) -> str:
+        """Async counterpart of run(); the graph runs on the event loop via astream.
 
-        Args:
-            question: User's question
-            status_callback: Optional callback function to report status updates.
-                           Should accept (tool_name: str, status: str) where status is 'start' or 'complete'
+        Blocking storage work (checkpoints, Chroma, SQLite, table rendering)
+        is moved to worker threads, so concurrent conversations share one
+        event loop instead of holding a thread each while waiting on I/O.
+        """
+        progress_token = progress_callback.set(status_callback)
+        session_token = session_id.set(self.thread_id)
+        try:
+            await asyncio.to_thread(retention.hold, self.thread_id)
+            last_event = None
+            async with async_client_scope():
+                async for event in self.part_1_graph.astream(
+                    {"messages": ("user", question)},
+                    {"configurable": {"thread_id": self.thread_id}},
+                    stream_mode="values",
+                ):
+                    last_event = event
+                    self._report_tool_events(event, status_callback)
+
+            content = last_event["messages"][-1].content if last_event else "No response."
+            return await asyncio.to_thread(self.replace_token_with_table, content)
+        finally:
+            session_id.reset(session_token)
+            progress_callback.reset(progress_token)
+
+    async def astream(self, question: str) -> AsyncIterator[StreamEvent]:
         """
+        Async counterpart of run_stream(), yielding the same events.
+
+        To stop early, iterate inside contextlib.aclosing so the run is
+        cancelled and its HTTP clients are closed right away.
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def _put(item: tuple[str, Any]) -> None:
+            # Tools report progress from worker threads
+            loop.call_soon_threadsafe(events.put_nowait, item)
+
+        handler = _StreamCallbackHandler(_put)
+
+        def _report(tool_name: str, status: str, detail: str | None = None) -> None:
+            if status == "progress":
+                _put(("progress", (tool_name, detail or "")))
+
+        async def _run_graph() -> None:
+            # The task runs in a copy of the caller's context, so these stay scoped to it
+            progress_callback.set(_report)
+            session_id.set(self.thread_id)
+            try:
+                await self.part_1_graph.ainvoke(
+                    {"messages": ("user", question)},
+                    {"configurable": {"thread_id": self.thread_id}, "callbacks": [handler]},
+                )
+            except Exception as e:
+                _put(("error", e))
+            finally:
+                _put(("end", None))
+
+        # Renew holds on tables already in this chat's history
+        await asyncio.to_thread(retention.hold, self.thread_id)
+
+        assembler = _StreamAssembler(self)
+        async with async_client_scope():
+            task = asyncio.create_task(_run_graph())
+            try:
+                while True:
+                    kind, payload = await events.get()
+                    for piece in assembler.feed(kind, payload):
+                        if piece[0] == "token":
+                            event = await asyncio.to_thread(assembler.emit, piece)
+                        else:
+                            event = assembler.emit(piece)
+                        if event is not None:
+                            yield event
+                    if kind == "end":
+                        break
+            finally:
+                # Stops the run if the caller stops iterating early; it must
+                # finish before the scope closes the HTTP clients it uses
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    def _report_tool_events(self, event: dict, status_callback=None) -> None:
+        """Report tool start/complete from one "values" event of the graph stream."""
+        if not status_callback or not event.get("messages"):
+            return
+        last_message = event["messages"][-1]
+
+        # If the message has tool_calls, it means tools are about to be executed
+        if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+            for tool_call in last_message.tool_calls:
+                status_callback(tool_call.get("name", "Unknown tool"), "start")
+
+        # If the message is a ToolMessage, it means a tool has completed
+        if hasattr(last_message, "type") and last_message.type == "tool":
+            if hasattr(last_message, "name"):
+                status_callback(last_message.name, "complete")
+
+    def _run(self, question: str, status_callback=None) -> str:
+        """Stream the graph for one question, reporting tool start/complete events."""
         events = self.part_1_graph.stream(
             {"messages": ("user", question)},
             {"configurable": {"thread_id": self.thread_id}},
@@ -150,24 +530,7 @@ class BookAssistant:
         last_event = None
         for event in events:
             last_event = event
-
-            # Check if we have tool calls in the last message
-            if event.get("messages"):
-                last_message = event["messages"][-1]
-
-                # If the message has tool_calls, it means tools are about to be executed
-                if hasattr(last_message, "tool_calls") and last_message.tool_calls:
-                    for tool_call in last_message.tool_calls:
-                        tool_name = tool_call.get("name", "Unknown tool")
-                        if status_callback:
-                            status_callback(tool_name, "start")
-
-                # If the message is a ToolMessage, it means a tool has completed
-                if hasattr(last_message, "type") and last_message.type == "tool":
-                    if hasattr(last_message, "name"):
-                        tool_name = last_message.name
-                        if status_callback:
-                            status_callback(tool_name, "complete")
+            self._report_tool_events(event, status_callback)
 
         content = last_event["messages"][-1].content if last_event else "No response."
         return self.replace_token_with_table(content)
@@ -1,15 +1,21 @@
 """LangChain tools for book search and retrieval."""
 
+import asyncio
+import hashlib
 import json
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable
 from uuid import uuid4
 
 from langchain_core.tools import tool
-import chromadb
 import logging
 
 from dotenv import load_dotenv
 
 from models.book import BookModel
+from models.config import AppConfig
+from models.presentation import PresentationRef
 from models.tool_schemas import (
     GoogleAPIRetrievalInput,
     PresentBookInfoInput,
@@ -18,6 +24,10 @@ from models.tool_schemas import (
 )
 from services.google_books_service import GoogleBooksService
 from utils.file_manager import FileManager
+from utils.ingestion_queue import IngestionQueue
+from utils.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from utils.retention import RetentionManager
+from utils.vector_store import VectorStore
 
 load_dotenv()
 
@@ -29,36 +39,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-chroma_client = chromadb.Client()
-vdb = chroma_client.get_or_create_collection("book_info")
+_app_config = AppConfig()
+vector_store = VectorStore(_app_config)
 
 _file_manager = FileManager()
 
+# Per-run status reporter set by BookAssistant.run; called as (tool_name, status, detail)
+progress_callback: ContextVar[Callable[..., None] | None] = ContextVar(
+    "progress_callback", default=None
+)
+
+
+# Conversation scope set by BookAssistant.run; books are tagged with it and search_db filters on it
+session_id: ContextVar[str | None] = ContextVar("session_id", default=None)
+
+
+def _report_progress(tool_name: str, detail: str) -> None:
+    """Send an intermediate progress update to the current run's status callback."""
+    callback = progress_callback.get()
+    if callback:
+        callback(tool_name, "progress", detail)
+
 
 def _validate_google_input(search_query: str, search_type: str) -> GoogleAPIRetrievalInput:
     """Validate and return sanitized input for googleAPI_retrieval."""
     return GoogleAPIRetrievalInput(search_query=search_query, search_type=search_type)
 
 
-def _validate_present_input(search_id: str, number_of_items: str) -> PresentBookInfoInput:
+def _validate_present_input(
+    search_id: str, number_of_items: str, start_rank: str = "1", sort_by: str = "rank"
+) -> PresentBookInfoInput:
     """Validate and return sanitized input for present_book_info."""
-    return PresentBookInfoInput(search_id=search_id, number_of_items=number_of_items)
+    return PresentBookInfoInput(
+        search_id=search_id,
+        number_of_items=number_of_items,
+        start_rank=start_rank,
+        sort_by=sort_by,
+    )
 
 
-def _validate_search_input(keywords: str, num_results: str) -> SearchDBInput:
+def _validate_search_input(
+    keywords: str | list[str],
+    num_results: str,
+    search_id: str = "",
+    category: str = "",
+    min_rating: str = "",
+    language: str = "",
+) -> SearchDBInput:
     """Validate and return sanitized input for search_db."""
-    return SearchDBInput(keywords=keywords, num_results=num_results)
+    return SearchDBInput(
+        keywords=keywords,
+        num_results=num_results,
+        search_id=search_id,
+        category=category,
+        min_rating=min_rating,
+        language=language,
+    )
 
 
-def _validate_rank_input(search_id: str, rank: str) -> GetBookByRankInput:
+def _validate_rank_input(search_id: str, rank: str | list[str]) -> GetBookByRankInput:
     """Validate and return sanitized input for get_book_by_rank."""
     return GetBookByRankInput(search_id=search_id, rank=rank)
 
 
 def _book_to_document(book: BookModel) -> str:
-    """Create rich document text for vector database."""
-    return f"""Rank: {book.rank}
-Title: {book.title}
+    """Create rich document text for vector database (independent of search rank)."""
+    return f"""Title: {book.title}
 Authors: {", ".join(book.authors)}
 Publisher: {book.publisher}
 Published Date: {book.publishedDate}
@@ -71,34 +117,289 @@ Description:
 {book.description}"""
 
 
-@tool
-def googleAPI_retrieval(search_query: str, search_type: str = "keywords") -> str:
-    """
-    This tool downloads book information based on flexible search criteria and stores it in the database.
-    Returns a unique search_id that can be used with present_book_info to display these specific results.
+def _book_id(book: BookModel, document: str) -> str:
+    """Derive a stable vector-store id from the volume id, ISBN or document content."""
+    if book.volumeId:
+        return f"volume:{book.volumeId}"
+    if book.isbn:
+        return f"isbn:{book.isbn}"
+    return "sha256:" + hashlib.sha256(document.encode("utf-8")).hexdigest()
 
-    Args:
-        search_query: The search term - can be a single term or multiple terms combined
-            - For keywords: You can combine multiple keywords (e.g., "science fiction adventure")
-            - For categories: You can combine multiple categories (e.g., "fiction mystery")
-            - For other types: Single values work best
-        search_type: Type of search - options are:
-            - "keywords" (default): General keyword search across all fields - best for combining multiple terms
-            - "category": Search by book category/subject - can combine multiple categories
-            - "title": Search specifically in book titles
-            - "author": Search by author name
-            - "isbn": Search by ISBN number
+
+def _upsert_books(ids: list[str], documents: list[str], metadata: list[dict]) -> int:
+    """
+    Insert new books and refresh metadata of known ones without re-embedding.
 
     Returns:
-        A message containing the search_id that should be used with present_book_info to display results
+        Number of newly embedded documents
+    """
+    # Collapse duplicates within the batch, keeping the best-ranked entry
+    unique: dict[str, tuple[str, dict]] = {}
+    for book_id, document, meta in zip(ids, documents, metadata):
+        unique.setdefault(book_id, (document, meta))
+
+    _ensure_lexical_index()
+    # Serializes with the retention sweeper's deletes and with compaction
+    with vector_store.write_lock:
+        vdb = vector_store.collection
+        found = vdb.get(ids=list(unique), include=["metadatas"])
+        stored = dict(zip(found["ids"], found["metadatas"]))
+        new_ids = [book_id for book_id in unique if book_id not in stored]
+        known_ids = [book_id for book_id in unique if book_id in stored]
+
+        if new_ids:
+            vdb.add(
+                ids=new_ids,
+                documents=[unique[i][0] for i in new_ids],
+                metadatas=[unique[i][1] for i in new_ids],
+            )
+        if known_ids:
+            vdb.update(ids=known_ids, metadatas=[unique[i][1] for i in known_ids])
+
+        _lexical_index.add(
+            new_ids + known_ids,
+            [unique[i][0] for i in new_ids] + [None] * len(known_ids),
+            [unique[i][1] for i in new_ids + known_ids],
+        )
 
-    Examples:
-        - googleAPI_retrieval("artificial intelligence machine learning", "keywords")
-        - googleAPI_retrieval("science fiction adventure", "keywords")
-        - googleAPI_retrieval("fiction mystery thriller", "category")
-        - googleAPI_retrieval("Stephen King", "author")
-        - googleAPI_retrieval("Harry Potter", "title")
+        limit = _app_config.vector_max_searches_per_entry
+        crowded = [
+            book_id
+            for book_id in known_ids
+            if len(_search_keys({**(stored[book_id] or {}), **unique[book_id][1]})) > limit
+        ]
+        if crowded:
+            _trim_search_keys(vdb, crowded, limit)
+    return len(new_ids)
+
+
+def _search_keys(meta: dict) -> list[str]:
+    """Membership keys of the searches a vector entry currently belongs to."""
+    return [key for key, value in meta.items() if key.startswith("search:") and value]
+
+
+def _trim_search_keys(vdb, ids: list[str], limit: int) -> None:
     """
+    Keep membership keys for only the `limit` most recently used searches.
+
+    Chroma cannot delete a metadata key in place, so each entry is deleted and
+    re-added with its stored embedding, without the dropped keys and without
+    keys the retention sweep has cleared. A search is stored before its
+    books are ingested, so keys of searches no longer stored go first.
+    """
+    records = vdb.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+    names = {
+        f"search_{key[len('search:'):]}.json"
+        for meta in records["metadatas"]
+        for key in _search_keys(meta)
+    }
+    accessed = {e.name: e.accessed_at for e in _file_manager.entry_stats() if e.name in names}
+
+    metadatas = []
+    for meta in records["metadatas"]:
+        recent = sorted(
+            _search_keys(meta),
+            key=lambda key: accessed.get(f"search_{key[len('search:'):]}.json", 0.0),
+            reverse=True,
+        )
+        dropped = set(recent[limit:])
+        metadatas.append(
+            {key: value for key, value in meta.items() if value is not False and key not in dropped}
+        )
+
+    vdb.delete(ids=records["ids"])
+    vdb.add(
+        ids=records["ids"],
+        embeddings=records["embeddings"],
+        documents=records["documents"],
+        metadatas=metadatas,
+    )
+    _lexical_index.remove(records["ids"])
+    _lexical_index.add(records["ids"], records["documents"], metadatas)
+
+
+_lexical_index = LexicalIndex()
+_lexical_loaded = threading.Event()
+_lexical_load_lock = threading.Lock()
+
+retention = RetentionManager(_file_manager, vector_store, _lexical_index, _app_config)
+
+
+def _ensure_lexical_index(batch_size: int = 1000) -> None:
+    """Build the lexical index from the persisted collection the first time it is needed."""
+    if _lexical_loaded.is_set():
+        return
+    with _lexical_load_lock:
+        if _lexical_loaded.is_set():
+            return
+        vdb = vector_store.collection
+        offset = 0
+        while True:
+            batch = vdb.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            if not batch["ids"]:
+                break
+            _lexical_index.add(batch["ids"], batch["documents"], batch["metadatas"])
+            offset += len(batch["ids"])
+        _lexical_loaded.set()
+
+
+_ingestion_queue = IngestionQueue(
+    _upsert_books,
+    max_batch=_app_config.ingestion_max_batch,
+    max_delay=_app_config.ingestion_max_delay_seconds,
+)
+
+
+def _ingest(search_id: str, ids: list[str], documents: list[str], metadata: list[dict]) -> None:
+    """Write books to the vector store, in the background when enabled."""
+    if _app_config.background_ingestion:
+        keys = [search_id]
+        current_session = session_id.get()
+        if current_session:
+            keys.append(f"session:{current_session}")
+        _ingestion_queue.submit(keys, ids, documents, metadata)
+    else:
+        _upsert_books(ids, documents, metadata)
+
+
+def _scope_tags(book: BookModel, search_id: str) -> dict:
+    """
+    Boolean membership keys used as vector-query pre-filters.
+
+    A stored book can belong to many searches, sessions and categories, and
+    Chroma merges metadata keys on update, so membership is recorded as one
+    key per scope rather than a single overwritten value. Only the keys of
+    the most recently used searches are kept (see `_trim_search_keys`).
+    """
+    tags = {f"search:{search_id}": True}
+    current_session = session_id.get()
+    if current_session:
+        tags[f"session:{current_session}"] = True
+    for category in book.categories:
+        tags[f"category:{category.strip().lower()}"] = True
+    return tags
+
+
+def _build_where(validated: SearchDBInput) -> dict | None:
+    """Translate search_db scopes and filters into a Chroma metadata filter."""
+    conditions: list[dict] = []
+    current_session = session_id.get()
+    if current_session:
+        conditions.append({f"session:{current_session}": True})
+    if validated.search_id:
+        conditions.append({f"search:{validated.search_id}": True})
+    if validated.category:
+        conditions.append({f"category:{validated.category.lower()}": True})
+    if validated.min_rating:
+        conditions.append({"rating_value": {"$gte": float(validated.min_rating)}})
+    if validated.language:
+        conditions.append({"language": validated.language.lower()})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def _dedup_key(meta: dict) -> tuple[str, str]:
+    """Key identifying the same book across editions and legacy entries."""
+    return (
+        str(meta.get("title", "")).strip().lower(),
+        str(meta.get("authors", "")).strip().lower(),
+    )
+
+
+def _vector_rankings(queries: list[str], n_results: int, where: dict | None) -> list[list[str]]:
+    """Best-first ids for each query from a single batched embedding query."""
+    if not queries:
+        return []
+    results = vector_store.collection.query(
+        query_embeddings=vector_store.embed_queries(queries),
+        n_results=n_results,
+        where=where,
+        include=[],
+    )
+    return results.get("ids") or [[] for _ in queries]
+
+
+def _dedup_pairs(pairs: list[tuple[str, dict]], n: int) -> list[tuple[str, dict]]:
+    """Keep the first n pairs describing distinct books."""
+    seen: set[tuple[str, str]] = set()
+    unique = []
+    for doc, meta in pairs:
+        key = _dedup_key(meta)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append((doc, meta))
+        if len(unique) >= n:
+            break
+    return unique
+
+
+def _retrieve_many(queries: list[str], n: int, where: dict | None) -> list[list[tuple[str, dict]]]:
+    """
+    Find up to n distinct books per query as (document, metadata) pairs.
+
+    In hybrid mode an exact title/author/ISBN match is answered from the
+    lexical index alone (no query embedding); otherwise BM25 and vector
+    rankings are fused with reciprocal rank fusion. Queries that need
+    embeddings share one batched vector query.
+    """
+    mode = _app_config.search_mode
+    # Over-fetch so duplicates of the same book can be dropped without losing results
+    fetch = n * 2
+
+    if mode == "vector":
+        results = vector_store.collection.query(
+            query_embeddings=vector_store.embed_queries(queries), n_results=fetch, where=where
+        )
+        documents = results.get("documents") or [[] for _ in queries]
+        metadatas = results.get("metadatas") or [[] for _ in queries]
+        return [_dedup_pairs(list(zip(d, m)), n) for d, m in zip(documents, metadatas)]
+
+    _ensure_lexical_index()
+    lexical = [
+        [doc_id for doc_id, _ in _lexical_index.search(query, fetch * 2, where)]
+        for query in queries
+    ]
+    exact = [
+        _lexical_index.exact_match(query, where) if mode == "hybrid" else []
+        for query in queries
+    ]
+    needs_vector = [
+        i for i in range(len(queries)) if mode == "hybrid" and not exact[i]
+    ]
+    vector = dict(
+        zip(needs_vector, _vector_rankings([queries[i] for i in needs_vector], fetch, where))
+    )
+
+    results = []
+    for i in range(len(queries)):
+        if exact[i]:
+            ranked_ids = exact[i] + [d for d in lexical[i] if d not in exact[i]]
+        elif i in vector:
+            ranked_ids = reciprocal_rank_fusion([lexical[i], vector[i]])
+        else:
+            ranked_ids = lexical[i]
+        # Vector hits written by another session may not be indexed lexically yet
+        pairs = [
+            _lexical_index.get(doc_id)
+            for doc_id in ranked_ids[: fetch * 2]
+            if doc_id in _lexical_index
+        ]
+        results.append(_dedup_pairs(pairs, n))
+    return results
+
+
+def _retrieve(query: str, n: int, where: dict | None) -> list[tuple[str, dict]]:
+    """Find up to n distinct books for a single query."""
+    return _retrieve_many([query], n, where)[0]
+
+
+def _start_retrieval(search_query: str, search_type: str) -> GoogleAPIRetrievalInput:
+    """Validate googleAPI_retrieval arguments, falling back to a keyword search."""
     try:
         validated = _validate_google_input(search_query, search_type)
     except Exception as e:
@@ -109,28 +410,34 @@ def googleAPI_retrieval(search_query: str, search_type: str = "keywords") -> str
         f"googleAPI_retrieval called with search_query='{validated.search_query}', "
         f"search_type='{validated.search_type}'"
     )
-    search_id = str(uuid4())
-
-    service = GoogleBooksService()
-    books = service.search(
-        search_type=validated.search_type,
-        keywords=validated.search_query if validated.search_type != "category" else None,
-        category=validated.search_query.lower() if validated.search_type == "category" else None,
-    )
-
-    if not books:
-        return (
-            f"No books found for the search query: '{validated.search_query}' "
-            f"with search type: '{validated.search_type}'"
-        )
-
+    return validated
+
+
+def _search_kwargs(validated: GoogleAPIRetrievalInput) -> dict[str, Any]:
+    """GoogleBooksService.search_iter arguments for a validated retrieval."""
+    is_category = validated.search_type == "category"
+    return {
+        "search_type": validated.search_type,
+        "keywords": validated.search_query if not is_category else None,
+        "category": validated.search_query.lower() if is_category else None,
+    }
+
+
+def _store_page(
+    validated: GoogleAPIRetrievalInput,
+    search_id: str,
+    books: list[BookModel],
+    total: int,
+) -> int:
+    """Persist and index one page of results; returns the running total of books."""
     documents = []
     ids = []
     metadata = []
 
     for book in books:
-        documents.append(_book_to_document(book))
-        ids.append(str(uuid4()))
+        document = _book_to_document(book)
+        documents.append(document)
+        ids.append(_book_id(book, document))
         metadata.append({
             "rank": str(book.rank),
             "title": book.title,
@@ -138,18 +445,37 @@ def googleAPI_retrieval(search_query: str, search_type: str = "keywords") -> str
             "publisher": book.publisher,
             "categories": ",".join(book.categories),
             "rating": str(book.averageRating or ""),
+            "rating_value": float(book.averageRating or 0.0),
+            "isbn": book.isbn,
+            "language": book.language.lower(),
             "search_query": validated.search_query,
             "search_type": validated.search_type,
             "search_id": search_id,
+            **_scope_tags(book, search_id),
         })
 
-    vdb.add(documents=documents, ids=ids, metadatas=metadata)
+    # Store the page before its vectors so the retention sweeper never sees them orphaned
+    _file_manager.append_books_json(f"search_{search_id}.json", books)
+    current_session = session_id.get()
+    if not total and current_session:
+        # Keeps the search, and the session's keys on its books, while the chat is open
+        retention.hold_searches(current_session, [search_id])
+    _ingest(search_id, ids, documents, metadata)
 
-    books_data = [b.to_dict() for b in books]
-    _file_manager.write_json(f"search_{search_id}.json", books_data)
+    total += len(books)
+    _report_progress("googleAPI_retrieval", f"{total} books retrieved")
+    return total
+
+
+def _retrieval_result(validated: GoogleAPIRetrievalInput, search_id: str, total: int) -> str:
+    if not total:
+        return (
+            f"No books found for the search query: '{validated.search_query}' "
+            f"with search type: '{validated.search_type}'"
+        )
 
     result = (
-        f"Successfully downloaded {len(books)} books for search query: '{validated.search_query}' "
+        f"Successfully downloaded {total} books for search query: '{validated.search_query}' "
         f"(search type: '{validated.search_type}'). Search ID: {search_id}"
     )
     logger.info(f"googleAPI_retrieval result: {result}")
@@ -157,55 +483,133 @@ def googleAPI_retrieval(search_query: str, search_type: str = "keywords") -> str
 
 
 @tool
-def search_db(keywords: str, num_results: str = "3") -> str:
+def googleAPI_retrieval(search_query: str, search_type: str = "keywords") -> str:
+    """
+    This tool downloads book information based on flexible search criteria and stores it in the database.
+    Returns a unique search_id that can be used with present_book_info to display these specific results.
+
+    Args:
+        search_query: The search term - can be a single term or multiple terms combined
+            - For keywords: You can combine multiple keywords (e.g., "science fiction adventure")
+            - For categories: You can combine multiple categories (e.g., "fiction mystery")
+            - For other types: Single values work best
+        search_type: Type of search - options are:
+            - "keywords" (default): General keyword search across all fields - best for combining multiple terms
+            - "category": Search by book category/subject - can combine multiple categories
+            - "title": Search specifically in book titles
+            - "author": Search by author name
+            - "isbn": Search by ISBN number
+
+    Returns:
+        A message containing the search_id that should be used with present_book_info to display results
+
+    Examples:
+        - googleAPI_retrieval("artificial intelligence machine learning", "keywords")
+        - googleAPI_retrieval("science fiction adventure", "keywords")
+        - googleAPI_retrieval("fiction mystery thriller", "category")
+        - googleAPI_retrieval("Stephen King", "author")
+        - googleAPI_retrieval("Harry Potter", "title")
+    """
+    validated = _start_retrieval(search_query, search_type)
+    search_id = str(uuid4())
+    total = 0
+
+    # Embed and persist each page as soon as it arrives
+    service = GoogleBooksService()
+    for books in service.search_iter(**_search_kwargs(validated)):
+        total = _store_page(validated, search_id, books, total)
+
+    return _retrieval_result(validated, search_id, total)
+
+
+@tool
+def search_db(
+    keywords: str | list[str],
+    num_results: str = "3",
+    search_id: str = "",
+    category: str = "",
+    min_rating: str = "",
+    language: str = "",
+) -> str:
     """
     This tool searches the vector database for books matching the given keywords or description.
     It uses semantic search to find relevant books based on meaning, not just exact matches.
+    Only books downloaded in this conversation are searched.
+    Pass a list of queries to run several searches in one call.
 
     Args:
-        keywords: Search keywords or description (e.g., "funny adventure books", "mystery thriller", "books about AI")
-        num_results: Number of results to return (default: "3", max: "10")
+        keywords: Search keywords or description (e.g., "funny adventure books", "mystery thriller", "books about AI"),
+            or a list of up to 5 such queries (e.g., ["space opera", "books about AI"])
+        num_results: Number of results to return per query (default: "3", max: "10")
+        search_id: Optional - only search books from this googleAPI_retrieval search
+        category: Optional - only books in this category (e.g., "Fiction")
+        min_rating: Optional - minimum average rating from "0" to "5" (e.g., "4")
+        language: Optional - language code (e.g., "en")
 
     Returns:
         Formatted information about the matching books
     """
     try:
-        validated = _validate_search_input(keywords, num_results)
+        validated = _validate_search_input(
+            keywords, num_results, search_id, category, min_rating, language
+        )
     except Exception:
-        validated = SearchDBInput(keywords=keywords, num_results="3")
+        try:
+            validated = SearchDBInput(keywords=keywords, num_results="3")
+        except Exception:
+            return "Invalid keywords. Please provide a search query."
 
     logger.info(
-        f"search_db called with keywords='{validated.keywords}', num_results='{validated.num_results}'"
+        f"search_db called with keywords='{validated.keywords}', num_results='{validated.num_results}', "
+        f"search_id='{validated.search_id}', category='{validated.category}', "
+        f"min_rating='{validated.min_rating}', language='{validated.language}'"
     )
     n = int(validated.num_results)
 
-    results = vdb.query(query_texts=[validated.keywords], n_results=n)
-    documents = results.get("documents", [[]])
-    metadatas = results.get("metadatas", [[]])
-
-    if not documents or not documents[0]:
-        result = (
-            f"No books found matching: '{validated.keywords}'. "
-            "Please download books first using googleAPI_retrieval."
-        )
-        logger.info(f"search_db result: {result}")
-        return result
-
-    output = f"Found {len(documents[0])} books matching '{validated.keywords}':\n\n"
-    for i, (doc, meta) in enumerate(zip(documents[0], metadatas[0]), 1):
-        output += f"--- Result {i} ---\n"
-        output += f"Title: {meta.get('title', 'Unknown')}\n"
-        output += f"Authors: {meta.get('authors', 'Unknown')}\n"
-        output += f"Rating: {meta.get('rating', 'N/A')}\n"
-        output += f"Categories: {meta.get('categories', 'Unknown')}\n"
-        output += f"\nPreview:\n{doc[:300]}...\n\n"
+    # Read-your-writes: wait only for queued writes inside this query's scope
+    current_session = session_id.get()
+    if validated.search_id:
+        _ingestion_queue.wait([validated.search_id])
+    elif current_session:
+        _ingestion_queue.wait([f"session:{current_session}"])
+    else:
+        _ingestion_queue.flush()
+
+    all_matches = _retrieve_many(validated.keywords, n, _build_where(validated))
+
+    sections = []
+    for query, matches in zip(validated.keywords, all_matches):
+        if not matches:
+            sections.append(
+                f"No books found matching: '{query}'. "
+                "Please download books first using googleAPI_retrieval."
+            )
+            continue
+
+        output = f"Found {len(matches)} books matching '{query}':\n\n"
+        for i, (doc, meta) in enumerate(matches, 1):
+            output += f"--- Result {i} ---\n"
+            output += f"Title: {meta.get('title', 'Unknown')}\n"
+            output += f"Authors: {meta.get('authors', 'Unknown')}\n"
+            output += f"Rating: {meta.get('rating', 'N/A')}\n"
+            output += f"Categories: {meta.get('categories', 'Unknown')}\n"
+            output += f"\nPreview:\n{doc[:300]}...\n\n"
+        sections.append(output)
 
-    logger.info(f"search_db result: Found {len(documents[0])} books")
-    return output
+    logger.info(
+        f"search_db result: Found {[len(m) for m in all_matches]} books for "
+        f"{len(validated.keywords)} queries"
+    )
+    return "\n".join(sections)
 
 
 @tool
-def present_book_info(search_id: str, number_of_items: str = "10") -> str:
+def present_book_info(
+    search_id: str,
+    number_of_items: str = "10",
+    start_rank: str = "1",
+    sort_by: str = "rank",
+) -> str:
     """
     This tool extracts the information of the top number_of_items books from a specific search and gives you a data view token.
     This token will render at the user's end. Just place this token in the final response.
@@ -216,6 +620,8 @@ def present_book_info(search_id: str, number_of_items: str = "10") -> str:
     Args:
         search_id: The unique search ID returned by googleAPI_retrieval (required)
         number_of_items: Number of books to display (default: "10")
+        start_rank: Position to start from, e.g. "11" for the second page of ten (default: "1")
+        sort_by: Display order - "rank" (default), "rating", "date" (newest first) or "title"
 
     Returns:
         A token in the format <data_retrieved=TOKEN> that will render as a table at the user's end
@@ -225,62 +631,82 @@ def present_book_info(search_id: str, number_of_items: str = "10") -> str:
         call present_book_info("abc-123", "5") to display 5 books from that search.
     """
     try:
-        validated = _validate_present_input(search_id, number_of_items)
+        validated = _validate_present_input(search_id, number_of_items, start_rank, sort_by)
     except Exception:
         validated = PresentBookInfoInput(search_id=search_id, number_of_items="10")
 
     logger.info(
         f"present_book_info called with search_id='{validated.search_id}', "
-        f"number_of_items='{validated.number_of_items}'"
+        f"number_of_items='{validated.number_of_items}', start_rank='{validated.start_rank}', "
+        f"sort_by='{validated.sort_by}'"
     )
-    token = str(uuid4())
     search_file = f"search_{validated.search_id}.json"
 
-    if not _file_manager.file_exists(search_file):
+    total = _file_manager.count_books(search_file)
+    if not total:
         return (
             f"Error: Search ID '{validated.search_id}' not found. "
             "Please use a valid search_id from a googleAPI_retrieval call."
         )
 
-    data = _file_manager.read_books_json(search_file)
-    count = min(int(validated.number_of_items), len(data))
-    info = [BookModel.from_dict(data[i]).to_dict() for i in range(count)]
-
-    _file_manager.write_json(f"{token}.json", info)
+    # The token is a reference to the stored search; books are read at render time
+    offset = min(int(validated.start_rank) - 1, total - 1)
+    ref = PresentationRef(
+        search_id=validated.search_id,
+        offset=offset,
+        count=min(int(validated.number_of_items), total - offset),
+        sort=validated.sort_by,
+    )
+    token = ref.to_token()
 
     result = f"<data_retrieved={token}>"
     logger.info(
-        f"present_book_info result: Generated token {token} for {len(info)} items "
+        f"present_book_info result: Generated token {token} for {ref.count} items "
         f"from search {validated.search_id}"
     )
     return result
 
 
+def _format_book_details(book: BookModel) -> str:
+    """Detailed text block for one book."""
+    return f"""Book Rank: {book.rank}
+Title: {book.title}
+Authors: {", ".join(book.authors)}
+Publisher: {book.publisher}
+Published Date: {book.publishedDate}
+Categories: {", ".join(book.categories)}
+
+Description:
+{book.description}"""
+
+
 @tool
-def get_book_by_rank(search_id: str, rank: str) -> str:
+def get_book_by_rank(search_id: str, rank: str | list[str]) -> str:
     """
-    This tool retrieves detailed information about a specific book by its rank/position number from a specific search.
+    This tool retrieves detailed information about books by their rank/position number from a specific search.
+    Several books can be fetched in one call.
 
     Args:
         search_id: The unique search ID returned by googleAPI_retrieval
-        rank: The rank/position of the book (e.g., "1" for first book, "10" for tenth book)
+        rank: The rank/position of the book (e.g., "1" for first book, "10" for tenth book),
+            a list of ranks (e.g., ["1", "4", "7"] or "1,4,7") or a range (e.g., "2-5"), up to 20 books
 
     Returns:
-        Detailed information about the book including title, authors, publisher, published date, description, and categories.
+        Detailed information about each book including title, authors, publisher, published date, description, and categories.
 
     Example:
         get_book_by_rank("abc-123", "5") - Gets the 5th book from search "abc-123"
+        get_book_by_rank("abc-123", "1-3") - Gets the first three books from search "abc-123"
     """
     try:
         validated = _validate_rank_input(search_id, rank)
     except Exception as e:
         logger.warning(f"get_book_by_rank validation error: {e}")
-        return "Invalid rank format. Please provide a valid number."
+        return "Invalid rank format. Please provide a valid number, list of numbers or range."
 
     logger.info(
         f"get_book_by_rank called with search_id='{validated.search_id}', rank='{validated.rank}'"
     )
-    rank_num = int(validated.rank)
     search_file = f"search_{validated.search_id}.json"
 
     if not _file_manager.file_exists(search_file):
@@ -290,30 +716,67 @@ def get_book_by_rank(search_id: str, rank: str) -> str:
         )
 
     try:
-        data = _file_manager.read_books_json(search_file)
+        total = _file_manager.count_books(search_file)
+        wanted = [rank_num for rank_num in validated.ranks if 1 <= rank_num <= total]
+        selected = {}
+        if wanted:
+            # One read of the slice covering every requested rank
+            first = min(wanted)
+            covering = _file_manager.read_books_slice(search_file, first - 1, max(wanted) - first + 1)
+            selected = {rank_num: covering[rank_num - first] for rank_num in wanted}
     except (ValueError, json.JSONDecodeError) as e:
         logger.error(f"get_book_by_rank error: {e}")
         return f"Error reading search data: {str(e)}"
 
-    if rank_num < 1 or rank_num > len(data):
-        return f"Invalid rank. Please provide a rank between 1 and {len(data)}."
-
-    book = BookModel.from_dict(data[rank_num - 1])
-    book_info = f"""Book Rank: {book.rank}
-Title: {book.title}
-Authors: {", ".join(book.authors)}
-Publisher: {book.publisher}
-Published Date: {book.publishedDate}
-Categories: {", ".join(book.categories)}
-
-Description:
-{book.description}"""
+    sections = []
+    found = []
+    for rank_num in validated.ranks:
+        if rank_num not in selected:
+            sections.append(
+                f"Invalid rank {rank_num}. Please provide a rank between 1 and {total}."
+            )
+            continue
+        book = BookModel.from_stored(selected[rank_num])
+        sections.append(_format_book_details(book))
+        found.append(book.title)
 
     logger.info(
-        f"get_book_by_rank result: Retrieved book '{book.title}' at rank {validated.rank} "
+        f"get_book_by_rank result: Retrieved {found} at rank {validated.rank} "
         f"from search {validated.search_id}"
     )
-    return book_info
+    return "\n\n".join(sections)
+
+
+# Async variants, used when the graph runs through ainvoke/astream.
+# Google Books pages are fetched on the event loop; the embedded Chroma and
+# SQLite stores have no async API, so their calls run on worker threads
+# (asyncio.to_thread copies the run's ContextVars).
+
+
+async def _agoogle_api_retrieval(search_query: str, search_type: str = "keywords") -> str:
+    validated = _start_retrieval(search_query, search_type)
+    search_id = str(uuid4())
+    total = 0
+
+    service = GoogleBooksService()
+    async for books in service.asearch_iter(**_search_kwargs(validated)):
+        total = await asyncio.to_thread(_store_page, validated, search_id, books, total)
+
+    return _retrieval_result(validated, search_id, total)
+
+
+def _offloaded(func: Callable[..., str]) -> Callable[..., Any]:
+    """Coroutine that runs a blocking tool function on a worker thread."""
+
+    async def run(*args: Any, **kwargs: Any) -> str:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return run
+
+
+googleAPI_retrieval.coroutine = _agoogle_api_retrieval
+for _blocking_tool in (search_db, present_book_info, get_book_by_rank):
+    _blocking_tool.coroutine = _offloaded(_blocking_tool.func)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+"""Per-book cost of loading and dumping BookModel: validated vs trusted paths.
+
+Books are synthetic but shaped like stored search results (long descriptions,
+several authors and categories).
+
+Usage:
+    python -m benchmarks.model_benchmark [--books 1000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+
+from components.book_table_renderer import BookTableRenderer
+from models.book import BookModel
+
+
+def make_books(count: int) -> list[dict]:
+    """Stored-format book dicts, as returned by FileManager.read_books_json."""
+    return [
+        BookModel(
+            rank=i + 1,
+            title=f"Book {i}",
+            authors=[f"Author {i}", f"Co-Author {i}"],
+            publisher="Publisher",
+            publishedDate="2020-01-01",
+            description="A long description of the book. " * 40,
+            categories=["Fiction", "Science"],
+            thumbnail=f"https://example.com/{i}.jpg",
+            averageRating=4.0,
+            ratingsCount=i,
+            pageCount=300,
+            language="en",
+            volumeId=f"vol{i}",
+            isbn=f"978000000{i:04d}",
+        ).to_dict()
+        for i in range(count)
+    ]
+
+
+def per_book_us(fn, count: int, repeat: int) -> float:
+    """Best-of-repeat time of fn (which handles `count` books), in microseconds per book."""
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) / count * 1e6
+
+
+def run(count: int, repeat: int) -> None:
+    data = make_books(count)
+    models = [BookModel.from_stored(d) for d in data]
+    renderer = BookTableRenderer()
+
+    cases = [
+        ("load", "from_dict (validated)", lambda: [BookModel.from_dict(d) for d in data]),
+        ("load", "from_stored (trusted)", lambda: [BookModel.from_stored(d) for d in data]),
+        ("dump", "model_dump", lambda: [m.model_dump() for m in models]),
+        ("dump", "to_dict", lambda: [m.to_dict() for m in models]),
+        (
+            "render",
+            "from_dict + render",
+            lambda: renderer.render([BookModel.from_dict(d) for d in data], "bench"),
+        ),
+        ("render", "render_from_dicts", lambda: renderer.render_from_dicts(data, "bench")),
+    ]
+
+    print(f"{count} books, best of {repeat}\n")
+    print(f"{'step':<8} {'path':<24} {'us/book':>9}")
+    for step, name, fn in cases:
+        print(f"{step:<8} {name:<24} {per_book_us(fn, count, repeat):>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.books, args.repeat)
@@ -0,0 +1,112 @@
+"""Latency and recall of search_db retrieval modes (vector, lexical, hybrid).
+
+Books are loaded from saved searches, ingested into a throwaway
+in-memory collection through the same code path as googleAPI_retrieval, and
+queried with known-item queries (exact titles, authors and ISBNs) plus
+description snippets.
+
+Usage:
+    python -m benchmarks.search_benchmark [--data-dir .] [--k 3] [--max-queries 200]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+import agent_tools
+from models.book import BookModel
+from models.config import AppConfig
+from utils.file_manager import FileManager
+from utils.lexical_index import LexicalIndex
+from utils.vector_store import VectorStore
+
+
+def load_books(data_dir: Path) -> list[BookModel]:
+    """Load distinct books from every stored search (and legacy search_*.json file) in data_dir."""
+    file_manager = FileManager(data_dir)
+    names = set(file_manager.list_files("search_"))
+    names.update(path.name for path in data_dir.glob("search_*.json"))
+    books: dict[str, BookModel] = {}
+    for name in sorted(names):
+        for data in file_manager.read_books_json(name):
+            book = BookModel.from_stored(data)
+            books.setdefault(agent_tools._book_id(book, agent_tools._book_to_document(book)), book)
+    return list(books.values())
+
+
+def build_queries(books: list[BookModel], max_queries: int, seed: int) -> list[tuple[str, str, tuple]]:
+    """Return (kind, query, expected dedup key) triples."""
+    queries = []
+    for book in books:
+        key = (book.title.strip().lower(), ",".join(book.authors).strip().lower())
+        queries.append(("title", book.title, key))
+        if book.isbn:
+            queries.append(("isbn", book.isbn, key))
+        words = book.description.split()
+        if len(words) >= 12:
+            queries.append(("description", " ".join(words[:12]), key))
+    random.Random(seed).shuffle(queries)
+    return queries[:max_queries]
+
+
+def ingest(books: list[BookModel]) -> None:
+    """Index books into a fresh in-memory vector store and lexical index."""
+    agent_tools.vector_store = VectorStore(
+        AppConfig(chroma_persist_path=None, chroma_collection_name="search_benchmark")
+    )
+    agent_tools._lexical_index = LexicalIndex()
+    agent_tools._lexical_loaded.set()
+
+    ids, documents, metadatas = [], [], []
+    for book in books:
+        document = agent_tools._book_to_document(book)
+        ids.append(agent_tools._book_id(book, document))
+        documents.append(document)
+        metadatas.append({
+            "title": book.title,
+            "authors": ",".join(book.authors),
+            "isbn": book.isbn,
+            "rating_value": float(book.averageRating or 0.0),
+        })
+    start = time.perf_counter()
+    agent_tools._upsert_books(ids, documents, metadatas)
+    print(f"Ingested {len(ids)} books in {time.perf_counter() - start:.2f}s")
+
+
+def run(queries: list[tuple[str, str, tuple]], k: int) -> None:
+    print(f"\n{'mode':<8} {'kind':<12} {'queries':>7} {'recall@' + str(k):>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in ("vector", "lexical", "hybrid"):
+        agent_tools._app_config.search_mode = mode
+        by_kind: dict[str, list[tuple[bool, float]]] = {}
+        for kind, query, expected in queries:
+            start = time.perf_counter()
+            matches = agent_tools._retrieve(query, k, None)
+            elapsed = (time.perf_counter() - start) * 1000
+            hit = any(agent_tools._dedup_key(meta) == expected for _, meta in matches)
+            by_kind.setdefault(kind, []).append((hit, elapsed))
+
+        for kind, rows in sorted(by_kind.items()):
+            latencies = sorted(ms for _, ms in rows)
+            recall = sum(hit for hit, _ in rows) / len(rows)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(
+                f"{mode:<8} {kind:<12} {len(rows):>7} {recall:>9.2%} "
+                f"{statistics.median(latencies):>8.2f} {p95:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=Path.cwd())
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--max-queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    books = load_books(args.data_dir)
+    if not books:
+        raise SystemExit(f"No saved searches found in {args.data_dir}")
+    ingest(books)
+    run(build_queries(books, args.max_queries, args.seed), args.k)
@@ -1,5 +1,6 @@
 """UI components for rendering."""
 
 from .book_table_renderer import BookTableRenderer
+from .chat_message import build_message
 
-__all__ = ["BookTableRenderer"]
+__all__ = ["BookTableRenderer", "build_message"]
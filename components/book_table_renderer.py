@@ -1,22 +1,35 @@
 """HTML rendering component for book tables using Jinja2 templates."""
 
+import base64
+import gzip
 import json
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 
 if TYPE_CHECKING:
     from models.book import BookModel
 
 TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
 
+# Markers delimiting the shared assets and each table in a rendered response
+ASSETS_START = "<!--book-table-assets-->"
+ASSETS_END = "<!--/book-table-assets-->"
+TABLE_START = "<!--book-table-->"
+TABLE_END = "<!--/book-table-->"
+
 
 def _html_escape(text: str) -> str:
     """Escape text for HTML display."""
     return text.replace('"', "&quot;").replace("<", "&lt;").replace(">", "&gt;")
 
 
+def _script_json(value) -> str:
+    """JSON safe to embed in a <script type="application/json"> element."""
+    return json.dumps(value).replace("<", "\\u003c")
+
+
 def _prepare_book_for_template(book: "BookModel", index: int) -> dict:
     """Convert BookModel to template-friendly dict with escaped values."""
     authors = ", ".join(book.authors)
@@ -41,26 +54,102 @@ def _prepare_book_for_template(book: "BookModel", index: int) -> dict:
 
 
 class BookTableRenderer:
-    """Renders book data as HTML tables using Jinja2 templates."""
+    """
+    Renders book data as HTML tables using Jinja2 templates.
+
+    Compiled templates and static assets are cached in memory. With reload
+    enabled (for template development) they are re-read when their files
+    change on disk.
 
-    def __init__(self, templates_dir: Path | None = None) -> None:
+    Tables with at least `virtualize_min_rows` books (0 disables) use the
+    virtualized mode: compact row data rendered in a scroll window, lazily
+    loaded covers, and descriptions decoded only when a row is clicked.
+    """
+
+    def __init__(
+        self,
+        templates_dir: Path | None = None,
+        reload: bool = False,
+        virtualize_min_rows: int = 0,
+    ) -> None:
         self.templates_dir = templates_dir or TEMPLATES_DIR
+        self.reload = reload
+        self.virtualize_min_rows = virtualize_min_rows
         self._env = Environment(
             loader=FileSystemLoader(str(self.templates_dir)),
             autoescape=select_autoescape(["html", "xml"]),
+            auto_reload=reload,
         )
+        self._templates: dict[str, Template] = {}
+        # name -> (mtime, content)
+        self._assets: dict[str, tuple[float, str]] = {}
+
+    def _template(self, name: str) -> Template:
+        """Compiled template, cached unless reload is enabled (Jinja then checks mtimes)."""
+        if self.reload:
+            return self._env.get_template(name)
+        template = self._templates.get(name)
+        if template is None:
+            template = self._templates[name] = self._env.get_template(name)
+        return template
+
+    def _asset(self, name: str) -> str:
+        """Contents of a static asset, re-read on change when reload is enabled."""
+        cached = self._assets.get(name)
+        if cached is not None and not self.reload:
+            return cached[1]
+        path = self.templates_dir / name
+        mtime = path.stat().st_mtime
+        if cached is None or cached[0] != mtime:
+            cached = self._assets[name] = (mtime, path.read_text())
+        return cached[1]
 
     def _load_styles(self) -> str:
-        """Load and return CSS styles."""
-        styles_path = self.templates_dir / "styles.css"
-        return f"<style>\n{styles_path.read_text()}\n</style>"
+        """Return the CSS styles as a <style> block."""
+        return f"<style>\n{self._asset('styles.css')}\n</style>"
+
+    def _load_library(self) -> str:
+        """Return the shared table script, which defines initBookTable."""
+        return self._asset("book_table.js")
+
+    def assets(self) -> str:
+        """Shared CSS and JS for any number of tables in the same document, wrapped in markers."""
+        return (
+            ASSETS_START
+            + self._load_styles()
+            + f"<script>\n{self._load_library()}\n</script>"
+            + ASSETS_END
+        )
+
+    def _render_table(self, books: list["BookModel"], unique_id: str) -> tuple[str, str]:
+        """Table markup and the per-table bootstrap call."""
+        safe_id = unique_id.replace("-", "_")
+        if self.virtualize_min_rows and len(books) >= self.virtualize_min_rows:
+            return self._render_virtual_table(books, safe_id)
+        prepared_books = [
+            _prepare_book_for_template(book, i + 1) for i, book in enumerate(books)
+        ]
+        html_output = self._template("book_table.html").render(
+            books=prepared_books, unique_id=safe_id
+        )
+        return html_output, f"initBookTable({json.dumps(safe_id)});"
 
-    def _load_script(self, unique_id: str) -> str:
-        """Load JavaScript and inject unique_id."""
-        script_path = self.templates_dir / "book_table.js"
-        script_content = script_path.read_text()
-        # Replace all occurrences of the placeholder
-        return script_content.replace("___UNIQUE_ID__", unique_id)
+    def _render_virtual_table(self, books: list["BookModel"], safe_id: str) -> tuple[str, str]:
+        """Virtualized table markup: row data as JSON, descriptions as one gzip blob."""
+        rows = [
+            [book.title, ", ".join(book.authors), book.publisher, book.publishedDate, book.thumbnail or ""]
+            for book in books
+        ]
+        descriptions = gzip.compress(
+            json.dumps([book.description for book in books]).encode("utf-8"), mtime=0
+        )
+        html_output = self._template("book_table_virtual.html").render(
+            unique_id=safe_id,
+            row_count=len(books),
+            rows_json=_script_json(rows),
+            details_json=_script_json(base64.b64encode(descriptions).decode("ascii")),
+        )
+        return html_output, f"initVirtualBookTable({json.dumps(safe_id)});"
 
     def render(
         self,
@@ -69,32 +158,35 @@ class BookTableRenderer:
         include_styles: bool = False,
     ) -> str:
         """
-        Render a list of books as HTML table with interactive details panel.
+        Render a list of books as a standalone HTML table with interactive details panel.
 
         Args:
             books: List of BookModel instances
-            unique_id: Unique identifier for this table (used for JS function names)
-            include_styles: If True, include CSS in output. Set False when multiple
-                tables are rendered - include styles once at the start.
+            unique_id: Unique identifier for this table (used for element ids)
+            include_styles: If True, include CSS in output. Use render_block
+                with assets() to render several tables that share one
+                stylesheet and script.
 
         Returns:
             HTML string for the book table
         """
-        safe_id = unique_id.replace("-", "_")
-        prepared_books = [
-            _prepare_book_for_template(book, i + 1) for i, book in enumerate(books)
-        ]
-
-        html_template = self._env.get_template("book_table.html")
-        html_output = html_template.render(books=prepared_books, unique_id=safe_id)
-
-        script = self._load_script(safe_id)
-        script_tag = f"<script>\n{script}\n</script>"
+        html_output, bootstrap = self._render_table(books, unique_id)
+        script_tag = f"<script>\n{self._load_library()}\n{bootstrap}\n</script>"
 
         if include_styles:
             return self._load_styles() + html_output + script_tag
         return html_output + script_tag
 
+    def render_block(self, books: list["BookModel"], unique_id: str) -> str:
+        """
+        One table of a multi-table response: markup and bootstrap wrapped in
+        TABLE_START/TABLE_END markers, without the shared assets (see assets()).
+
+        Safe to call from several threads at once.
+        """
+        html_output, bootstrap = self._render_table(books, unique_id)
+        return f"{TABLE_START}{html_output}<script>{bootstrap}</script>{TABLE_END}"
+
     def render_from_dicts(
         self,
         books_data: list[dict],
@@ -114,5 +206,5 @@ class BookTableRenderer:
         """
         from models.book import BookModel
 
-        books = [BookModel.from_dict(b) for b in books_data]
+        books = [BookModel.from_stored(b) for b in books_data]
         return self.render(books, unique_id, include_styles)
@@ -0,0 +1,71 @@
+"""Split assistant responses into structured chat-message segments."""
+
+import hashlib
+import re
+
+from components.book_table_renderer import ASSETS_END, ASSETS_START, TABLE_END, TABLE_START
+from models.chat import ChatMessage, MessageSegment
+
+# Iframe sizing: header and container padding plus ~115px per row (90px cover + padding)
+_BASE_HEIGHT = 100
+_ROW_HEIGHT = 115
+_MAX_HEIGHT = 850
+# Virtualized tables build their rows in the browser and declare the count instead
+_ROW_COUNT_RE = re.compile(r'data-row-count="(\d+)"')
+
+
+def table_height(table_html: str) -> int:
+    """Iframe height that fits a rendered table without scrolling (up to a cap)."""
+    row_count = table_html.count('<tr class="book-row"') + sum(
+        int(count) for count in _ROW_COUNT_RE.findall(table_html)
+    )
+    return min(_BASE_HEIGHT + row_count * _ROW_HEIGHT, _MAX_HEIGHT)
+
+
+def _text_segment(text: str) -> list[MessageSegment]:
+    text = text.strip()
+    return [MessageSegment(kind="text", text=text)] if text else []
+
+
+def build_message(role: str, content: str) -> tuple[ChatMessage, dict[str, str]]:
+    """
+    Parse a response once into text and table segments.
+
+    Each table is rendered in its own iframe, so the response's shared CSS/JS
+    block is attached to every table here rather than on each rerun.
+
+    Args:
+        role: "user" or "assistant"
+        content: Response text, possibly containing rendered tables
+
+    Returns:
+        The message and the standalone HTML of its tables, keyed by content hash
+    """
+    assets = ""
+    if ASSETS_START in content:
+        assets_start = content.find(ASSETS_START)
+        assets_end = content.find(ASSETS_END, assets_start) + len(ASSETS_END)
+        assets = content[assets_start:assets_end]
+        content = content[:assets_start] + content[assets_end:]
+
+    segments: list[MessageSegment] = []
+    tables: dict[str, str] = {}
+    remaining = content
+    while TABLE_START in remaining:
+        table_start = remaining.find(TABLE_START)
+        table_end = remaining.find(TABLE_END, table_start)
+        if table_end == -1:
+            break
+        table_end += len(TABLE_END)
+        segments.extend(_text_segment(remaining[:table_start]))
+
+        table_html = assets + remaining[table_start:table_end]
+        key = hashlib.sha256(table_html.encode("utf-8")).hexdigest()
+        tables[key] = table_html
+        segments.append(
+            MessageSegment(kind="table", table_key=key, height=table_height(table_html))
+        )
+        remaining = remaining[table_end:]
+    segments.extend(_text_segment(remaining))
+
+    return ChatMessage(role=role, segments=segments), tables
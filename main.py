@@ -1,6 +1,8 @@
 import streamlit as st
 from agent import BookAssistant
 import streamlit.components.v1 as components
+from components.chat_message import build_message, table_height
+from models.chat import ChatMessage, MessageSegment
 
 # Configure Streamlit page
 st.set_page_config(layout="wide")
@@ -8,7 +10,8 @@ st.set_page_config(layout="wide")
 
 # Section: Initialize BookAssistant instance
 def get_assistant():
-    # find all json files in the current directory and delete the
+    # One assistant (and conversation thread) per browser session; stored
+    # results are cleaned up by the retention sweeper (utils.retention)
     if "assistant" not in st.session_state:
         st.session_state.assistant = BookAssistant()
     return st.session_state.assistant
@@ -17,51 +20,30 @@ def get_assistant():
 # Section: Initialize Session State
 def initialize_session_state():
     if "messages" not in st.session_state:
+        # ChatMessage list; table HTML is kept once in `tables`, keyed by content hash
         st.session_state.messages = []
+        st.session_state.tables = {}
 
 
-def render_message(content):
-    """Render message content, handling HTML tables specially"""
-    if '<div class="books-layout">' in content:
-        # Process multiple tables by finding all table blocks
-        remaining_content = content
-
-        while "<style>" in remaining_content:
-            # Find the start of the table block
-            table_start = remaining_content.find("<style>")
-
-            # Render any text/markdown before this table
-            text_before = remaining_content[:table_start].strip()
-            if text_before:
-                st.markdown(text_before, unsafe_allow_html=True)
-
-            # Find the end of this table block (</script> tag)
-            table_end = remaining_content.find("</script>", table_start) + len(
-                "</script>"
+def render_segments(segments: list[MessageSegment]):
+    """Render pre-parsed message segments; tables replay their stored HTML and height."""
+    for segment in segments:
+        if segment.kind == "table":
+            components.html(
+                st.session_state.tables[segment.table_key],
+                height=segment.height,
+                scrolling=False,
             )
+        else:
+            st.markdown(segment.text, unsafe_allow_html=True)
 
-            # Extract and render this table
-            table_html = remaining_content[table_start:table_end]
-
-            # Calculate dynamic height based on number of rows
-            # Count the number of table rows in this table
-            row_count = table_html.count('<tr class="book-row"')
-            # Base height (header + padding) + row height * number of rows
-            # Each row is approximately 110px (90px cover + 20px padding)
-            # Add 100px for header and container padding
-            calculated_height = min(100 + (row_count * 115), 850)
 
-            components.html(table_html, height=calculated_height, scrolling=False)
-
-            # Move to the remaining content after this table
-            remaining_content = remaining_content[table_end:]
-
-        # Render any remaining text after all tables
-        if remaining_content.strip():
-            st.markdown(remaining_content.strip(), unsafe_allow_html=True)
-    else:
-        # Regular text message - use markdown for proper rendering
-        st.markdown(content, unsafe_allow_html=True)
+def add_message(role: str, content: str) -> ChatMessage:
+    """Parse content into segments once and add it to the chat history."""
+    message, tables = build_message(role, content)
+    st.session_state.tables.update(tables)
+    st.session_state.messages.append(message)
+    return message
 
 
 def create_status_callback(status_container):
@@ -71,11 +53,16 @@ def create_status_callback(status_container):
         status_container: Streamlit status container to write updates to
 
     Returns:
-        Callback function that accepts (tool_name: str, status: str)
+        Callback function that accepts (tool_name: str, status: str, detail: str | None);
+        detail is the progress text, or the elapsed time for "complete"
     """
 
-    def update_status(tool_name: str, status: str):
+    def update_status(tool_name: str, status: str, detail: str | None = None):
         """Update the status display when tools are called"""
+        if status == "progress":
+            status_container.write(f"⏳ {detail}")
+            return
+
         tool_messages = {
             "googleAPI_retrieval": {
                 "start": "🔍 **Searching Google Books API** - Fetching book data from external source...",
@@ -98,6 +85,8 @@ def create_status_callback(status_container):
         message = tool_messages.get(tool_name, {}).get(
             status, f"⚙️ {tool_name}: {status}"
         )
+        if status == "complete" and detail:
+            message += f" ({detail})"
         status_container.write(message)
 
     return update_status
@@ -106,8 +95,8 @@ def create_status_callback(status_container):
 def display_chat_history():
     """Display all messages from chat history."""
     for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            render_message(message["content"])
+        with st.chat_message(message.role):
+            render_segments(message.segments)
 
 
 def handle_user_input(prompt: str, assistant: BookAssistant):
@@ -122,7 +111,7 @@ def handle_user_input(prompt: str, assistant: BookAssistant):
         st.write(prompt)
 
     # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    add_message("user", prompt)
 
     # Create a status container for tool execution updates
     with st.chat_message("assistant"):
@@ -131,21 +120,37 @@ def handle_user_input(prompt: str, assistant: BookAssistant):
         # Create status callback
         status_callback = create_status_callback(status_container)
 
-        # Process user input using agent.py function with status callback
-        assistant_response = assistant.run(prompt, status_callback=status_callback)
+        # Render text and tables as they stream in
+        assistant_response = "No response."
+        text_placeholder = None
+        text = ""
+        for event in assistant.run_stream(prompt):
+            if event.kind == "text":
+                if text_placeholder is None:
+                    text_placeholder = st.empty()
+                text += event.text
+                text_placeholder.markdown(text, unsafe_allow_html=True)
+            elif event.kind == "table":
+                # Text after the table goes below it
+                text_placeholder = None
+                text = ""
+                components.html(event.text, height=table_height(event.text), scrolling=False)
+            elif event.kind == "tool_start":
+                status_callback(event.tool, "start")
+            elif event.kind == "tool_end":
+                status_callback(event.tool, "complete", f"{event.elapsed:.1f}s")
+            elif event.kind == "progress":
+                status_callback(event.tool, "progress", event.text)
+            elif event.kind == "done":
+                assistant_response = event.text
 
         # Update status to complete
         status_container.update(
             label="✅ Request completed", state="complete", expanded=False
         )
 
-        # Display assistant response
-        render_message(assistant_response)
-
-    # Add assistant response to chat history
-    st.session_state.messages.append(
-        {"role": "assistant", "content": assistant_response}
-    )
+    # Parse the response once; reruns replay the stored segments
+    add_message("assistant", assistant_response)
 
 
 def main():
@@ -9,6 +9,8 @@ from .tool_schemas import (
     GetBookByRankInput,
 )
 from .config import BookInfoConfig, AppConfig
+from .presentation import PresentationRef
+from .chat import ChatMessage, MessageSegment, StreamEvent
 
 __all__ = [
     "BookModel",
@@ -24,4 +26,8 @@ __all__ = [
     "GetBookByRankInput",
     "BookInfoConfig",
     "AppConfig",
+    "PresentationRef",
+    "ChatMessage",
+    "MessageSegment",
+    "StreamEvent",
 ]
@@ -29,6 +29,7 @@ class VolumeInfo(BaseModel):
     language: Optional[str] = None
     previewLink: Optional[str] = None
     infoLink: Optional[str] = None
+    industryIdentifiers: Optional[list[dict[str, Any]]] = None
 
     model_config = {"extra": "allow"}
 
@@ -36,6 +37,7 @@ class VolumeInfo(BaseModel):
 class GoogleBooksItem(BaseModel):
     """Single item from Google Books API response."""
 
+    id: Optional[str] = None
     volumeInfo: Optional[VolumeInfo | dict[str, Any]] = None
 
     model_config = {"extra": "allow"}
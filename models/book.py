@@ -1,8 +1,10 @@
 """Core book data models."""
 
-from typing import Optional
+from typing import Any, Mapping, Optional
 from pydantic import BaseModel, Field
 
+_setattr = object.__setattr__
+
 
 class BookModel(BaseModel):
     """Main book data model with all fields."""
@@ -21,6 +23,8 @@ class BookModel(BaseModel):
     language: str = "Unknown"
     previewLink: str = ""
     infoLink: str = ""
+    volumeId: str = ""
+    isbn: str = ""
 
     model_config = {"extra": "allow"}
 
@@ -42,11 +46,43 @@ class BookModel(BaseModel):
             language=data.get("language", "Unknown"),
             previewLink=data.get("previewLink", ""),
             infoLink=data.get("infoLink", ""),
+            volumeId=data.get("volumeId", ""),
+            isbn=data.get("isbn", ""),
         )
 
+    @classmethod
+    def from_stored(cls, data: Mapping[str, Any]) -> "BookModel":
+        """
+        Create BookModel from a dict written by to_dict, without validation.
+
+        Missing fields get their defaults as in from_dict. List values are
+        shared with data, not copied. Only use this for records this app stored
+        itself; data from the API is validated in GoogleBooksService.
+        """
+        fields = cls.model_fields
+        if data.keys() == fields.keys():
+            values, extra = dict(data), {}
+        elif fields.keys() - data.keys():
+            return cls.model_construct(**{"rank": 0, **data})
+        else:
+            values = {name: data[name] for name in fields}
+            extra = {k: v for k, v in data.items() if k not in fields}
+        # Same attributes model_construct sets, without its per-field default handling
+        book = cls.__new__(cls)
+        _setattr(book, "__dict__", values)
+        _setattr(book, "__pydantic_extra__", extra)
+        _setattr(book, "__pydantic_fields_set__", set(values))
+        _setattr(book, "__pydantic_private__", None)
+        return book
+
     def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return self.model_dump(exclude_none=False, exclude_defaults=False)
+        """
+        Convert to dictionary for JSON serialization.
+
+        Fields are all plain values, so a shallow copy of the field values
+        (plus extras) matches model_dump at a fraction of the cost.
+        """
+        return {**self.__dict__, **(self.__pydantic_extra__ or {})}
 
 
 class SearchMetadata(BaseModel):
@@ -0,0 +1,48 @@
+"""Chat message models for the Streamlit UI."""
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class MessageSegment(BaseModel):
+    """One piece of a chat message: markdown text or a rendered book table."""
+
+    kind: Literal["text", "table"]
+    # Markdown for text segments
+    text: str = ""
+    # Content hash of the table HTML, which is kept once per session and keyed by it
+    table_key: str = ""
+    # Iframe height for table segments, computed when the message is built
+    height: int = Field(default=0, ge=0)
+
+    model_config = {"extra": "forbid", "frozen": True}
+
+
+class ChatMessage(BaseModel):
+    """A chat message stored as pre-parsed segments, so reruns only replay them."""
+
+    role: Literal["user", "assistant"]
+    segments: list[MessageSegment]
+
+    model_config = {"extra": "forbid", "frozen": True}
+
+
+class StreamEvent(BaseModel):
+    """
+    One item from BookAssistant.run_stream.
+
+    kind:
+        "text": a text delta in `text`
+        "table": a standalone rendered table (HTML with assets) in `text`
+        "tool_start" / "tool_end": a tool call in `tool`; tool_end carries `elapsed` seconds
+        "progress": intermediate tool progress for `tool`, described in `text`
+        "done": the full rendered response in `text`, as returned by BookAssistant.run
+    """
+
+    kind: Literal["text", "table", "tool_start", "tool_end", "progress", "done"]
+    text: str = ""
+    tool: str = ""
+    elapsed: float | None = None
+
+    model_config = {"extra": "forbid", "frozen": True}
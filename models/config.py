@@ -1,6 +1,6 @@
 """Configuration models."""
 
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 
 import os
@@ -12,11 +12,37 @@ load_dotenv()
 class BookInfoConfig(BaseModel):
     """Configuration for Google Books API service."""
 
-    url: str = "https://www.googleapis.com/books/v1/volumes"
+    url: str = Field(
+        default_factory=lambda: os.getenv(
+            "GOOGLE_BOOKS_API_URL", "https://www.googleapis.com/books/v1/volumes"
+        )
+    )
     api_key: Optional[str] = Field(default_factory=lambda: os.getenv("GOOGLE_BOOKS_API_KEY"))
     max_allowed_results: int = 40
     max_results: int = 100
     start_index: int = 0
+    # Number of result pages fetched in parallel; 1 fetches pages sequentially
+    max_concurrent_requests: int = Field(default=3, ge=1)
+    # Request only the fields BookModel uses and stop paging at totalItems
+    lean_fetch: bool = True
+    # Shared HTTP connection pool (see services.http_client)
+    pool_connections: int = Field(default=4, ge=1)
+    pool_maxsize: int = Field(default=10, ge=1)
+    connect_timeout: float = 3.05
+    read_timeout: float = 10.0
+    # On-disk response cache (see services.response_cache)
+    cache_enabled: bool = True
+    cache_dir: str = ".cache/google_books"
+    cache_ttl_seconds: float = 6 * 60 * 60
+    cache_stale_seconds: float = 24 * 60 * 60
+    cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    # "record" saves live responses to fixtures_dir, "replay" serves them offline
+    http_mode: Literal["live", "record", "replay"] = Field(
+        default_factory=lambda: os.getenv("GOOGLE_BOOKS_HTTP_MODE", "live")
+    )
+    fixtures_dir: str = Field(
+        default_factory=lambda: os.getenv("GOOGLE_BOOKS_FIXTURES_DIR", "fixtures/google_books")
+    )
 
     model_config = {"extra": "forbid"}
 
@@ -26,5 +52,35 @@ class AppConfig(BaseModel):
 
     book_info: BookInfoConfig = Field(default_factory=BookInfoConfig)
     chroma_collection_name: str = "book_info"
+    # Directory for the persistent Chroma index; None keeps it in memory
+    chroma_persist_path: Optional[str] = ".chroma"
+    # Persistent document-hash -> vector cache in front of the embedding function
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = ".cache/embeddings.sqlite3"
+    embedding_cache_max_entries: int = Field(default=100_000, ge=1)
+    # Embed and write search results on a background worker (see utils.ingestion_queue)
+    background_ingestion: bool = True
+    ingestion_max_batch: int = Field(default=256, ge=1)
+    ingestion_max_delay_seconds: float = Field(default=0.05, ge=0)
+    # search_db retrieval: embeddings only, BM25 only, or both fused
+    search_mode: Literal["vector", "lexical", "hybrid"] = "hybrid"
+    # A vector entry keeps membership keys for at most this many searches,
+    # the most recently used ones; older searches stop matching it
+    vector_max_searches_per_entry: int = Field(default=32, ge=1)
+    # Re-read table templates and assets when they change (template development)
+    template_reload: bool = Field(
+        default_factory=lambda: os.getenv("BOOK_ASSISTANT_TEMPLATE_RELOAD", "") == "1"
+    )
+    # Tables with at least this many books render virtualized (0 disables)
+    table_virtualize_min_rows: int = Field(default=25, ge=0)
+    # Retention (see utils.retention): stored entries unused for longer than the TTL,
+    # and the least recently used beyond the size budget, are deleted along with
+    # vector entries no remaining search refers to; 0 disables a limit
+    retention_ttl_seconds: float = Field(default=30 * 24 * 3600, ge=0)
+    retention_max_bytes: int = Field(default=512 * 1024 * 1024, ge=0)
+    # Holds on data shown in a chat lapse if the chat is idle for this long
+    retention_reference_ttl_seconds: float = Field(default=7 * 24 * 3600, ge=0)
+    # Background sweep interval; 0 disables the sweeper (the CLI still works)
+    retention_sweep_interval_seconds: float = Field(default=3600, ge=0)
 
     model_config = {"extra": "forbid"}
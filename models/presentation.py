@@ -0,0 +1,40 @@
+"""Presentation token models."""
+
+import re
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+SortOrder = Literal["rank", "rating", "date", "title"]
+
+_TOKEN_RE = re.compile(
+    r"^(?P<search_id>[\w-]+):(?P<offset>\d+):(?P<count>\d+)(?::(?P<sort>rank|rating|date|title))?$"
+)
+
+
+class PresentationRef(BaseModel):
+    """Lightweight reference to a slice of a stored search, encoded in a data view token."""
+
+    search_id: str = Field(..., min_length=1)
+    offset: int = Field(default=0, ge=0)
+    count: int = Field(default=10, ge=1, le=100)
+    sort: SortOrder = "rank"
+
+    model_config = {"extra": "forbid", "frozen": True}
+
+    def to_token(self) -> str:
+        """Encode as the value placed inside <data_retrieved=...>."""
+        return f"{self.search_id}:{self.offset}:{self.count}:{self.sort}"
+
+    @classmethod
+    def from_token(cls, token: str) -> "PresentationRef | None":
+        """Decode a token value, or return None for legacy (stored-copy) tokens."""
+        match = _TOKEN_RE.match(token.strip())
+        if not match:
+            return None
+        return cls(
+            search_id=match["search_id"],
+            offset=int(match["offset"]),
+            count=int(match["count"]),
+            sort=match["sort"] or "rank",
+        )
@@ -6,6 +6,9 @@ from pydantic import BaseModel, Field, field_validator
 
 SearchType = Literal["keywords", "category", "title", "author", "isbn"]
 
+MAX_BATCH_QUERIES = 5
+MAX_BATCH_RANKS = 20
+
 
 class GoogleAPIRetrievalInput(BaseModel):
     """Input schema for googleAPI_retrieval tool."""
@@ -34,6 +37,8 @@ class PresentBookInfoInput(BaseModel):
 
     search_id: str = Field(..., min_length=1)
     number_of_items: str = "10"
+    start_rank: str = "1"
+    sort_by: str = "rank"
 
     model_config = {"extra": "forbid"}
 
@@ -46,15 +51,42 @@ class PresentBookInfoInput(BaseModel):
         except ValueError:
             return "10"
 
+    @field_validator("start_rank")
+    @classmethod
+    def validate_start_rank(cls, v: str) -> str:
+        try:
+            return str(max(1, int(v)))
+        except ValueError:
+            return "1"
+
+    @field_validator("sort_by", mode="before")
+    @classmethod
+    def sort_by_normalize(cls, v: str) -> str:
+        normalized = str(v).strip().lower()
+        if normalized not in ["rank", "rating", "date", "title"]:
+            return "rank"
+        return normalized
+
 
 class SearchDBInput(BaseModel):
-    """Input schema for search_db tool."""
+    """Input schema for search_db tool (one query or a batch of queries)."""
 
-    keywords: str = Field(..., min_length=1)
+    keywords: list[str] = Field(..., min_length=1)
     num_results: str = "3"
+    search_id: str = ""
+    category: str = ""
+    min_rating: str = ""
+    language: str = ""
 
     model_config = {"extra": "forbid"}
 
+    @field_validator("keywords", mode="before")
+    @classmethod
+    def keywords_to_list(cls, v: str | list[str]) -> list[str]:
+        queries = [v] if isinstance(v, str) else list(v)
+        queries = [str(q).strip() for q in queries if str(q).strip()]
+        return list(dict.fromkeys(queries))[:MAX_BATCH_QUERIES]
+
     @field_validator("num_results")
     @classmethod
     def validate_num_results(cls, v: str) -> str:
@@ -64,22 +96,55 @@ class SearchDBInput(BaseModel):
         except ValueError:
             return "3"
 
+    @field_validator("search_id", "category", "language")
+    @classmethod
+    def filter_normalize(cls, v: str) -> str:
+        return v.strip()
+
+    @field_validator("min_rating")
+    @classmethod
+    def validate_min_rating(cls, v: str) -> str:
+        if not v.strip():
+            return ""
+        try:
+            return str(max(0.0, min(float(v), 5.0)))
+        except ValueError:
+            return ""
+
 
 class GetBookByRankInput(BaseModel):
-    """Input schema for get_book_by_rank tool."""
+    """Input schema for get_book_by_rank tool (one rank, a list or a range)."""
 
     search_id: str = Field(..., min_length=1)
     rank: str = Field(..., min_length=1)
 
     model_config = {"extra": "forbid"}
 
-    @field_validator("rank")
+    @field_validator("rank", mode="before")
     @classmethod
-    def validate_rank(cls, v: str) -> str:
+    def validate_rank(cls, v: str | int | list[str | int]) -> str:
+        """Normalize "5", "1,3,7", "2-6" or ["1", "4"] to a comma-separated rank list."""
+        parts = v if isinstance(v, list) else str(v).split(",")
+        ranks: list[int] = []
         try:
-            n = int(v)
-            if n < 1:
-                raise ValueError("Rank must be positive")
-            return str(n)
+            for part in parts:
+                part = str(part).strip()
+                if not part:
+                    continue
+                if "-" in part:
+                    low, high = (int(x) for x in part.split("-", 1))
+                    # Only the first MAX_BATCH_RANKS ranks of a range can be kept
+                    ranks.extend(range(low, min(high, low + MAX_BATCH_RANKS - 1) + 1))
+                else:
+                    ranks.append(int(part))
         except ValueError:
-            raise ValueError("Rank must be a valid positive integer")
+            raise ValueError("Rank must be a valid positive integer, list or range")
+        if not ranks or any(n < 1 for n in ranks):
+            raise ValueError("Rank must be positive")
+        ranks = list(dict.fromkeys(ranks))[:MAX_BATCH_RANKS]
+        return ",".join(str(n) for n in ranks)
+
+    @property
+    def ranks(self) -> list[int]:
+        """Requested ranks in order."""
+        return [int(n) for n in self.rank.split(",")]
@@ -1,5 +1,30 @@
 """Service modules."""
 
 from .google_books_service import GoogleBooksService
+from .http_client import (
+    get_session,
+    set_session,
+    close_sessions,
+    get_async_client,
+    aclose_async_clients,
+    async_client_scope,
+)
+from .response_cache import ResponseCache, get_response_cache
+from .fixtures import FixtureStore, RecordingSession, ReplaySession
+from .fake_server import FakeGoogleBooksServer
 
-__all__ = ["GoogleBooksService"]
+__all__ = [
+    "GoogleBooksService",
+    "get_session",
+    "set_session",
+    "close_sessions",
+    "get_async_client",
+    "aclose_async_clients",
+    "async_client_scope",
+    "ResponseCache",
+    "get_response_cache",
+    "FixtureStore",
+    "RecordingSession",
+    "ReplaySession",
+    "FakeGoogleBooksServer",
+]
@@ -0,0 +1,159 @@
+"""Local stand-in for the Google Books volumes endpoint, serving recorded fixtures.
+
+Usage:
+    python -m services.fake_server --fixtures fixtures/google_books --port 8765 --latency 0.2
+
+Then point the app at it with GOOGLE_BOOKS_API_URL=http://127.0.0.1:8765/books/v1/volumes
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from services.fixtures import FixtureStore
+
+VOLUMES_PATH = "/books/v1/volumes"
+
+
+class FakeGoogleBooksServer:
+    """
+    Threaded HTTP server that replays recorded volumes responses.
+
+    Args:
+        fixtures_dir: Directory of fixtures written in record mode
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        latency: Seconds to sleep before every response
+        jitter: Extra random latency, uniformly drawn from [0, jitter]
+        error_rate: Probability in [0, 1] of answering with `error_status`
+        error_status: HTTP status used for injected errors
+        seed: Seed for the error/jitter random generator
+    """
+
+    def __init__(
+        self,
+        fixtures_dir: Path | str,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int | None = None,
+    ) -> None:
+        self.store = FixtureStore(fixtures_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.request_count = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Volumes endpoint URL to use as BookInfoConfig.url."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{VOLUMES_PATH}"
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._random_lock:
+            self.request_count += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self._random.random() < self.error_rate
+        return delay, fail
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                parts = urlsplit(self.path)
+                if parts.path != VOLUMES_PATH:
+                    self._send(404, {"error": f"Unknown path {parts.path}"})
+                    return
+
+                delay, fail = server._draw()
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    self._send(server.error_status, {"error": "Injected error"})
+                    return
+
+                params = dict(parse_qsl(parts.query))
+                recorded = server.store.load(params)
+                if recorded is None:
+                    self._send(404, {"error": "No recorded fixture for request"})
+                    return
+                self._send(recorded["status"], recorded["body"])
+
+            def _send(self, status: int, body: dict) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeGoogleBooksServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeGoogleBooksServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded Google Books fixtures locally.")
+    parser.add_argument("--fixtures", default="fixtures/google_books")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeGoogleBooksServer(
+        args.fixtures,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    print(f"Serving fixtures from {args.fixtures} at {fake.url}")
+    try:
+        fake._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake._httpd.server_close()
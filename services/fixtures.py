@@ -0,0 +1,103 @@
+"""Record/replay support for Google Books API responses."""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Mapping
+
+import requests
+
+from services.response_cache import normalize_query
+
+# Query parameters that never affect the response body
+_IGNORED_PARAMS = {"key"}
+
+
+def fixture_key(params: Mapping[str, Any]) -> str:
+    """Build the fixture key for a set of request query parameters."""
+    normalized = {
+        name: normalize_query(str(value)) if name == "q" else str(value)
+        for name, value in params.items()
+        if name not in _IGNORED_PARAMS and value is not None
+    }
+    raw = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """Reads and writes recorded API responses as JSON files in a directory."""
+
+    def __init__(self, fixtures_dir: Path | str) -> None:
+        self.fixtures_dir = Path(fixtures_dir)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.fixtures_dir / f"{key}.json"
+
+    def load(self, params: Mapping[str, Any]) -> dict[str, Any] | None:
+        """
+        Load the recorded response for the given parameters.
+
+        Returns:
+            Dict with 'status' and 'body', or None if nothing was recorded
+        """
+        path = self._path(fixture_key(params))
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, params: Mapping[str, Any], status: int, body: Any) -> None:
+        """Record a response for the given parameters."""
+        recorded_params = {
+            k: v for k, v in params.items() if k not in _IGNORED_PARAMS and v is not None
+        }
+        path = self._path(fixture_key(params))
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"params": recorded_params, "status": status, "body": body}, f, indent=2)
+            os.replace(tmp_path, path)
+
+
+def _make_response(url: str, status: int, body: Any) -> requests.Response:
+    """Build a requests.Response from a recorded fixture."""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(body).encode("utf-8")
+    response.encoding = "utf-8"
+    return response
+
+
+class RecordingSession(requests.Session):
+    """Session that performs real requests and records successful JSON responses."""
+
+    def __init__(self, store: FixtureStore) -> None:
+        super().__init__()
+        self.store = store
+
+    def get(self, url, params=None, **kwargs) -> requests.Response:
+        response = super().get(url, params=params, **kwargs)
+        if response.ok:
+            self.store.save(params or {}, response.status_code, response.json())
+        return response
+
+
+class ReplaySession(requests.Session):
+    """Session that serves recorded responses and never touches the network."""
+
+    def __init__(self, store: FixtureStore) -> None:
+        super().__init__()
+        self.store = store
+
+    def get(self, url, params=None, **kwargs) -> requests.Response:
+        recorded = self.store.load(params or {})
+        if recorded is None:
+            return _make_response(url, 404, {"error": "No recorded fixture for request"})
+        return _make_response(url, recorded["status"], recorded["body"])
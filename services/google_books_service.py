@@ -1,17 +1,43 @@
 """Google Books API service with Pydantic models."""
 
+import asyncio
 import requests
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Iterator
+
+import httpx
 
 from models.book import BookModel
 from models.config import BookInfoConfig
+from services.http_client import get_async_client, get_session
+from services.response_cache import ResponseCache, get_response_cache, normalize_query
+
+# Partial-response projection covering only the fields BookModel is built from
+LEAN_FIELDS = (
+    "totalItems,"
+    "items(id,volumeInfo(title,authors,publisher,publishedDate,description,categories,"
+    "imageLinks(thumbnail,smallThumbnail),averageRating,ratingsCount,pageCount,"
+    "language,previewLink,infoLink,industryIdentifiers))"
+)
 
 
 class GoogleBooksService:
     """Fetches and processes book data from Google Books API."""
 
-    def __init__(self, config: BookInfoConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: BookInfoConfig | None = None,
+        session: requests.Session | None = None,
+        cache: ResponseCache | None = None,
+        async_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self.config = config or BookInfoConfig()
+        self._session = session or get_session(self.config)
+        # An explicit session takes precedence over the shared async client
+        self._async_client = async_client
+        self._use_async_client = async_client is not None or session is None
+        self._cache = cache if cache is not None else get_response_cache(self.config)
         self._index = 0
         self._processed_results: list[BookModel] = []
 
@@ -40,18 +66,279 @@ class GoogleBooksService:
         start_index: int,
         max_results: int,
     ) -> dict[str, Any]:
-        """Fetch a single page of results from the API."""
+        """Fetch a single page of results, serving from the response cache when possible."""
+        max_results = min(max_results, self.config.max_allowed_results)
+        if self._cache is None:
+            return self._request_page(query, start_index, max_results)
+
+        key = self._cache_key(query, start_index, max_results)
+        data = self._cached_page(key, query, start_index, max_results)
+        if data is not None:
+            return data
+
+        data = self._request_page(query, start_index, max_results)
+        self._cache.set(key, data)
+        return data
+
+    def _cached_page(
+        self, key: str, query: str, start_index: int, max_results: int
+    ) -> dict[str, Any] | None:
+        """Cached page data, scheduling a background refresh if it is stale."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if not entry.fresh:
+            self._cache.revalidate(
+                key, lambda: self._request_page(query, start_index, max_results)
+            )
+        return entry.data
+
+    def _cache_key(self, query: str, start_index: int, max_results: int) -> str:
+        return ResponseCache.make_key(
+            self.config.url,
+            normalize_query(query),
+            start_index,
+            max_results,
+            LEAN_FIELDS if self.config.lean_fetch else "",
+        )
+
+    def _params(self, query: str, start_index: int, max_results: int) -> dict[str, Any]:
+        """Query parameters for one page request (unset values are omitted)."""
         params = {
             "q": query,
-            "maxResults": min(max_results, self.config.max_allowed_results),
+            "maxResults": max_results,
             "key": self.config.api_key,
             "orderBy": "relevance",
             "startIndex": start_index,
         }
-        response = requests.get(self.config.url, params=params)
+        if self.config.lean_fetch:
+            params["fields"] = LEAN_FIELDS
+        return {name: value for name, value in params.items() if value is not None}
+
+    def _request_page(
+        self,
+        query: str,
+        start_index: int,
+        max_results: int,
+    ) -> dict[str, Any]:
+        """Fetch a single page of results from the API."""
+        response = self._session.get(
+            self.config.url,
+            params=self._params(query, start_index, max_results),
+            timeout=(self.config.connect_timeout, self.config.read_timeout),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _safe_fetch_page(
+        self,
+        query: str,
+        start_index: int,
+        max_results: int,
+    ) -> dict[str, Any] | None:
+        """Fetch a single page, returning None if the request fails."""
+        try:
+            return self._fetch_page(query, start_index, max_results)
+        except requests.RequestException:
+            return None
+
+    def _iter_pages(
+        self,
+        query: str,
+        pages: list[tuple[int, int]],
+    ) -> Iterator[dict[str, Any] | None]:
+        """
+        Yield page responses in page order. A failed request yields None.
+
+        In lean fetch mode the first page is fetched on its own and its
+        `totalItems` is used to drop later pages that cannot exist before they
+        are requested; the remaining pages are then fetched together. A cached
+        first page is served without a request, so repeated searches still
+        cost a single round trip.
+        """
+        first_wave, rest = self._split_waves(pages)
+        first = None
+        for index, results in enumerate(self._fetch_pages(query, first_wave)):
+            if index == 0:
+                first = results
+            yield results
+        if first:
+            yield from self._fetch_pages(query, self._trim_pages(first, rest))
+
+    def _split_waves(
+        self, pages: list[tuple[int, int]]
+    ) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        """Split pages into the ones fetched before `totalItems` is known and the rest."""
+        if not self.config.lean_fetch:
+            return pages, []
+        return pages[:1], pages[1:]
+
+    @staticmethod
+    def _trim_pages(first: dict[str, Any], pages: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Drop pages starting at or past the first page's `totalItems`."""
+        total_items = first.get("totalItems")
+        if isinstance(total_items, int):
+            return [page for page in pages if page[0] < total_items]
+        return pages
+
+    def _fetch_pages(
+        self,
+        query: str,
+        pages: list[tuple[int, int]],
+    ) -> Iterator[dict[str, Any] | None]:
+        """
+        Fetch pages and yield their responses in page order.
+
+        Pages are fetched concurrently when the configured fan-out allows it,
+        but are always yielded in the order of `pages` so ranks stay stable.
+        """
+        if not pages:
+            return
+
+        workers = min(self.config.max_concurrent_requests, len(pages))
+        if workers <= 1:
+            for start, batch_size in pages:
+                yield self._safe_fetch_page(query, start, batch_size)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._safe_fetch_page, query, start, batch_size)
+                for start, batch_size in pages
+            ]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    async def _afetch_page(
+        self,
+        query: str,
+        start_index: int,
+        max_results: int,
+    ) -> dict[str, Any]:
+        """Async counterpart of `_fetch_page`."""
+        max_results = min(max_results, self.config.max_allowed_results)
+        if self._cache is None:
+            return await self._arequest_page(query, start_index, max_results)
+
+        # The on-disk cache does file I/O under a threading lock, so keep it off the loop
+        key = self._cache_key(query, start_index, max_results)
+        data = await asyncio.to_thread(self._cached_page, key, query, start_index, max_results)
+        if data is not None:
+            return data
+
+        data = await self._arequest_page(query, start_index, max_results)
+        await asyncio.to_thread(self._cache.set, key, data)
+        return data
+
+    async def _arequest_page(
+        self,
+        query: str,
+        start_index: int,
+        max_results: int,
+    ) -> dict[str, Any]:
+        """
+        Fetch a single page of results from the API without blocking the event loop.
+
+        Falls back to the synchronous session on a worker thread when no async
+        client is available (record/replay mode or a session override).
+        """
+        client = self._async_client
+        if client is None and self._use_async_client:
+            client = get_async_client(self.config)
+        if client is None:
+            return await asyncio.to_thread(
+                self._request_page, query, start_index, max_results
+            )
+
+        response = await client.get(
+            self.config.url, params=self._params(query, start_index, max_results)
+        )
         response.raise_for_status()
         return response.json()
 
+    async def _asafe_fetch_page(
+        self,
+        query: str,
+        start_index: int,
+        max_results: int,
+    ) -> dict[str, Any] | None:
+        """Fetch a single page asynchronously, returning None if the request fails."""
+        try:
+            return await self._afetch_page(query, start_index, max_results)
+        except (httpx.HTTPError, requests.RequestException, ValueError):
+            return None
+
+    async def _aiter_pages(
+        self,
+        query: str,
+        pages: list[tuple[int, int]],
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        """Async counterpart of `_iter_pages`."""
+        first_wave, rest = self._split_waves(pages)
+        first = None
+        index = 0
+        async with aclosing(self._afetch_pages(query, first_wave)) as wave:
+            async for results in wave:
+                if index == 0:
+                    first = results
+                index += 1
+                yield results
+        if first:
+            async with aclosing(self._afetch_pages(query, self._trim_pages(first, rest))) as wave:
+                async for results in wave:
+                    yield results
+
+    async def _afetch_pages(
+        self,
+        query: str,
+        pages: list[tuple[int, int]],
+    ) -> AsyncIterator[dict[str, Any] | None]:
+        """
+        Fetch pages as concurrent tasks and yield their responses in page order.
+
+        At most `max_concurrent_requests` requests are in flight at once;
+        tasks still pending when the caller stops iterating are cancelled and
+        awaited.
+        """
+        if not pages:
+            return
+
+        limit = asyncio.Semaphore(max(1, self.config.max_concurrent_requests))
+
+        async def fetch(start: int, batch_size: int) -> dict[str, Any] | None:
+            async with limit:
+                return await self._asafe_fetch_page(query, start, batch_size)
+
+        tasks = [asyncio.create_task(fetch(start, size)) for start, size in pages]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _page_plan(self, max_results: int) -> list[tuple[int, int]]:
+        """(startIndex, maxResults) for each page needed to cover max_results."""
+        return [
+            (start, min(max_results - start, self.config.max_allowed_results))
+            for start in range(0, max_results, self.config.max_allowed_results)
+        ]
+
+    def _process_page(self, results: dict[str, Any]) -> list[BookModel]:
+        """Convert a page response to BookModels, skipping malformed items."""
+        batch: list[BookModel] = []
+        for item in results.get("items") or []:
+            try:
+                batch.append(self._process_item(item))
+            except (KeyError, ValueError):
+                continue
+        return batch
+
     def _process_item(self, item: dict[str, Any]) -> BookModel:
         """Convert API item to BookModel."""
         volume_info = item.get("volumeInfo", {})
@@ -59,6 +346,11 @@ class GoogleBooksService:
         thumbnail = (
             image_links.get("thumbnail") or image_links.get("smallThumbnail") or ""
         )
+        identifiers = {
+            ident.get("type"): ident.get("identifier")
+            for ident in volume_info.get("industryIdentifiers") or []
+        }
+        isbn = identifiers.get("ISBN_13") or identifiers.get("ISBN_10") or ""
 
         self._index += 1
         return BookModel(
@@ -76,17 +368,22 @@ class GoogleBooksService:
             language=volume_info.get("language", "Unknown"),
             previewLink=volume_info.get("previewLink", ""),
             infoLink=volume_info.get("infoLink", ""),
+            volumeId=item.get("id") or "",
+            isbn=isbn,
         )
 
-    def search(
+    def search_iter(
         self,
         search_type: str = "keywords",
         keywords: str | None = None,
         category: str | None = None,
         max_results: int | None = None,
-    ) -> list[BookModel]:
+    ) -> Iterator[list[BookModel]]:
         """
-        Search Google Books API and return list of BookModel.
+        Search Google Books API and yield one batch of BookModel per page.
+
+        Batches are yielded in rank order as soon as each page is available,
+        so callers can process results incrementally.
 
         Args:
             search_type: One of 'keywords', 'category', 'title', 'author', 'isbn'
@@ -94,33 +391,86 @@ class GoogleBooksService:
             category: Category for category search
             max_results: Maximum results to fetch (default from config)
 
-        Returns:
-            List of BookModel instances
+        Yields:
+            Lists of BookModel instances, one per non-empty page
         """
         self._index = 0
-        self._processed_results = []
         max_results = max_results or self.config.max_results
 
         query = self._build_query(search_type, keywords, category)
         if not query or query == "subject:":
-            return []
+            return
 
-        for start in range(0, max_results, self.config.max_allowed_results):
-            batch_size = min(max_results - start, self.config.max_allowed_results)
-            try:
-                results = self._fetch_page(query, start, batch_size)
-            except requests.RequestException:
+        for results in self._iter_pages(query, self._page_plan(max_results)):
+            if not results or not results.get("items"):
                 break
 
-            items = results.get("items") or []
-            if not items:
-                break
+            batch = self._process_page(results)
+            if batch:
+                yield batch
 
-            for item in items:
-                try:
-                    book = self._process_item(item)
-                    self._processed_results.append(book)
-                except (KeyError, ValueError):
-                    continue
+    async def asearch_iter(
+        self,
+        search_type: str = "keywords",
+        keywords: str | None = None,
+        category: str | None = None,
+        max_results: int | None = None,
+    ) -> AsyncIterator[list[BookModel]]:
+        """
+        Async counterpart of `search_iter`: yield one batch of BookModel per page.
+
+        Pages are fetched with the shared httpx client, so waiting on the API
+        does not hold a thread.
+        """
+        self._index = 0
+        max_results = max_results or self.config.max_results
 
+        query = self._build_query(search_type, keywords, category)
+        if not query or query == "subject:":
+            return
+
+        async with aclosing(self._aiter_pages(query, self._page_plan(max_results))) as pages:
+            async for results in pages:
+                if not results or not results.get("items"):
+                    break
+
+                batch = self._process_page(results)
+                if batch:
+                    yield batch
+
+    def search(
+        self,
+        search_type: str = "keywords",
+        keywords: str | None = None,
+        category: str | None = None,
+        max_results: int | None = None,
+    ) -> list[BookModel]:
+        """
+        Search Google Books API and return list of BookModel.
+
+        Args:
+            search_type: One of 'keywords', 'category', 'title', 'author', 'isbn'
+            keywords: Search keywords (for keywords, title, author, isbn)
+            category: Category for category search
+            max_results: Maximum results to fetch (default from config)
+
+        Returns:
+            List of BookModel instances
+        """
+        self._processed_results = []
+        for batch in self.search_iter(search_type, keywords, category, max_results):
+            self._processed_results.extend(batch)
+        return self._processed_results
+
+    async def asearch(
+        self,
+        search_type: str = "keywords",
+        keywords: str | None = None,
+        category: str | None = None,
+        max_results: int | None = None,
+    ) -> list[BookModel]:
+        """Async counterpart of `search`."""
+        self._processed_results = []
+        async for batch in self.asearch_iter(search_type, keywords, category, max_results):
+            self._processed_results.extend(batch)
         return self._processed_results
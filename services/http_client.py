@@ -0,0 +1,161 @@
+"""Process-wide pooled HTTP sessions for outbound API calls.
+
+Synchronous callers share requests sessions. Async callers get one
+httpx.AsyncClient per event loop, since async connections cannot be shared
+across loops. Async entry points wrap their work in `async_client_scope`, and
+a loop's clients are closed when its last scope exits.
+"""
+
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from models.config import BookInfoConfig
+from services.fixtures import FixtureStore, RecordingSession, ReplaySession
+
+_sessions: dict[tuple, requests.Session] = {}
+_override: requests.Session | None = None
+_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+# Open async_client_scope blocks per event loop (only touched from the loop's own thread)
+_scope_counts: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int]" = (
+    weakref.WeakKeyDictionary()
+)
+# Google APIs only compress responses when the User-Agent mentions gzip
+_HEADERS = {"Accept-Encoding": "gzip, deflate", "User-Agent": "book-assistant (gzip)"}
+
+
+def _create_session(
+    pool_connections: int,
+    pool_maxsize: int,
+    http_mode: str = "live",
+    fixtures_dir: str = "",
+) -> requests.Session:
+    """Create a keep-alive session with a sized connection pool."""
+    if http_mode == "replay":
+        return ReplaySession(FixtureStore(fixtures_dir))
+    if http_mode == "record":
+        session = RecordingSession(FixtureStore(fixtures_dir))
+    else:
+        session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(_HEADERS)
+    return session
+
+
+def get_session(config: BookInfoConfig | None = None) -> requests.Session:
+    """
+    Return the shared session for the given pool configuration.
+
+    Sessions are created once per distinct pool size and HTTP mode and reused
+    by every caller, so connections stay alive across service instances.
+    """
+    if _override is not None:
+        return _override
+
+    config = config or BookInfoConfig()
+    key = (
+        config.pool_connections,
+        config.pool_maxsize,
+        config.http_mode,
+        config.fixtures_dir if config.http_mode != "live" else "",
+    )
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _create_session(*key)
+            _sessions[key] = session
+        return session
+
+
+def set_session(session: requests.Session | None) -> None:
+    """
+    Override the shared session for every caller (e.g. a test stand-in).
+
+    Pass None to go back to the pooled default sessions.
+    """
+    global _override
+    _override = session
+
+
+def close_sessions() -> None:
+    """Close all pooled sessions and drop their connections."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def get_async_client(config: BookInfoConfig | None = None) -> httpx.AsyncClient | None:
+    """
+    Return the running event loop's shared async client for the given pool configuration.
+
+    Returns None when requests must go through the synchronous session
+    instead: in record/replay mode (fixtures are requests-based) or while a
+    session override is set. Must be called from a coroutine.
+    """
+    config = config or BookInfoConfig()
+    if _override is not None or config.http_mode != "live":
+        return None
+
+    loop = asyncio.get_running_loop()
+    key = (config.pool_connections, config.pool_maxsize, config.connect_timeout, config.read_timeout)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                headers=_HEADERS,
+                limits=httpx.Limits(
+                    max_connections=config.pool_maxsize,
+                    max_keepalive_connections=config.pool_connections,
+                ),
+                timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+            )
+            clients[key] = client
+    return client
+
+
+async def aclose_async_clients() -> None:
+    """Close the running event loop's async clients."""
+    with _lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+@asynccontextmanager
+async def async_client_scope() -> AsyncIterator[None]:
+    """
+    Mark a unit of async work (e.g. one conversation turn) that may use the loop's clients.
+
+    Scopes nest and overlap freely; the loop's clients are closed when the
+    last open scope exits, so no sockets outlive the work on that loop.
+    """
+    loop = asyncio.get_running_loop()
+    _scope_counts[loop] = _scope_counts.get(loop, 0) + 1
+    try:
+        yield
+    finally:
+        _scope_counts[loop] -= 1
+        if not _scope_counts[loop]:
+            del _scope_counts[loop]
+            await aclose_async_clients()
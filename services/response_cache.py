@@ -0,0 +1,227 @@
+"""On-disk TTL + LRU cache for Google Books API responses."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from models.config import BookInfoConfig
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached response with its age classification."""
+
+    data: dict[str, Any]
+    stored_at: float
+    fresh: bool
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a built query so equivalent searches share a cache key."""
+    return " ".join(query.lower().split())
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU cache of API page responses stored as files on disk.
+
+    Entries younger than `ttl` are fresh. Entries older than `ttl` but younger
+    than `ttl + stale_ttl` may still be served while a background refresh runs
+    (stale-while-revalidate), and are used as a fallback when the API fails.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | str,
+        ttl: float,
+        stale_ttl: float,
+        max_bytes: int,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key hash -> size in bytes, ordered from least to most recently used
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._revalidating: set[str] = set()
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "revalidations": 0,
+        }
+        self._load_index()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable cache key from request parts."""
+        raw = json.dumps([str(p) for p in parts])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from files already on disk (oldest access first)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used entries until the cache fits its budget."""
+        while self._index and self._total_bytes > self.max_bytes:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _remove_locked(self, key: str) -> None:
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        Look up a cached response.
+
+        Returns:
+            The entry (fresh or servable-stale), or None on a miss
+        """
+        path = self._path(key)
+        with self._lock:
+            if key not in self._index:
+                self._stats["misses"] += 1
+                return None
+            try:
+                with open(path, "r") as f:
+                    payload = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._remove_locked(key)
+                self._stats["misses"] += 1
+                return None
+
+            age = time.time() - payload["stored_at"]
+            if age > self.ttl + self.stale_ttl:
+                self._remove_locked(key)
+                self._stats["misses"] += 1
+                return None
+
+            self._index.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+            fresh = age <= self.ttl
+            self._stats["hits" if fresh else "stale_hits"] += 1
+            return CacheEntry(data=payload["data"], stored_at=payload["stored_at"], fresh=fresh)
+
+    def set(self, key: str, data: dict[str, Any]) -> None:
+        """Store a response, evicting least recently used entries if needed."""
+        body = json.dumps({"stored_at": time.time(), "data": data})
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            with open(tmp_path, "w") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+            old_size = self._index.pop(key, None)
+            if old_size is not None:
+                self._total_bytes -= old_size
+            self._index[key] = size
+            self._total_bytes += size
+            self._evict_locked()
+
+    def revalidate(self, key: str, fetch: Callable[[], dict[str, Any]]) -> None:
+        """Refresh an entry in the background; concurrent refreshes of a key are collapsed."""
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            self._stats["revalidations"] += 1
+
+        def _run() -> None:
+            try:
+                self.set(key, fetch())
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove_locked(key)
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+            }
+
+
+_caches: dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(config: BookInfoConfig | None = None) -> ResponseCache | None:
+    """
+    Return the shared cache for the configured directory, or None if disabled.
+
+    The cache is also disabled in record/replay mode so every request reaches
+    the recorder or the fixtures.
+    """
+    config = config or BookInfoConfig()
+    if not config.cache_enabled or config.http_mode != "live":
+        return None
+
+    cache_dir = str(Path(config.cache_dir).resolve())
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = ResponseCache(
+                cache_dir,
+                ttl=config.cache_ttl_seconds,
+                stale_ttl=config.cache_stale_seconds,
+                max_bytes=config.cache_max_bytes,
+            )
+            _caches[cache_dir] = cache
+        return cache
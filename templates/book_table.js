@@ -1,6 +1,5 @@
-(function() {
-    const uniqueId = '___UNIQUE_ID__';
-    
+// Shared by every table in a document; each table calls initBookTable(uniqueId)
+window.initBookTable = window.initBookTable || function(uniqueId) {
     function showBookDetails(title, authors, publisher, date, description, thumbnail, row) {
         const detailsDiv = document.getElementById('bookDetails_' + uniqueId);
         const contentDiv = document.getElementById('detailsContent_' + uniqueId);
@@ -74,4 +73,178 @@
         // DOM is already loaded, run immediately
         attachEventListeners();
     }
-})();
+};
+
+// Large tables: rows come from a JSON payload and only the visible window is
+// in the DOM. Descriptions are a gzip+base64 blob decoded on the first click.
+window.initVirtualBookTable = window.initVirtualBookTable || function(uniqueId) {
+    const OVERSCAN = 5;
+    const container = document.getElementById('tableContainer_' + uniqueId);
+    const tbody = document.getElementById('rows_' + uniqueId);
+    const rows = JSON.parse(document.getElementById('rowData_' + uniqueId).textContent);
+    const detailBlob = JSON.parse(document.getElementById('detailData_' + uniqueId).textContent);
+    let rowHeight = 116;
+    let descriptions = null;
+    let selectedIndex = -1;
+    let rendered = [-1, -1];
+
+    function getDescriptions() {
+        if (!descriptions) {
+            const bytes = Uint8Array.from(atob(detailBlob), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            descriptions = new Response(stream).text().then(JSON.parse);
+        }
+        return descriptions;
+    }
+
+    function cell(row, content) {
+        const td = document.createElement('td');
+        if (content instanceof Node) {
+            td.appendChild(content);
+        } else {
+            td.textContent = content;
+        }
+        row.appendChild(td);
+    }
+
+    function cover(book) {
+        if (!book[4]) {
+            const div = document.createElement('div');
+            div.className = 'no-cover';
+            div.textContent = 'No Cover';
+            return div;
+        }
+        const img = document.createElement('img');
+        img.className = 'book-cover';
+        img.loading = 'lazy';
+        img.alt = book[0];
+        img.src = book[4];
+        return img;
+    }
+
+    function spacer(height) {
+        const tr = document.createElement('tr');
+        tr.className = 'spacer';
+        const td = document.createElement('td');
+        td.colSpan = 6;
+        td.style.height = height + 'px';
+        tr.appendChild(td);
+        return tr;
+    }
+
+    function renderWindow() {
+        const headerHeight = container.querySelector('thead').offsetHeight;
+        const top = Math.max(0, container.scrollTop - headerHeight);
+        const first = Math.max(0, Math.floor(top / rowHeight) - OVERSCAN);
+        const visible = Math.ceil(container.clientHeight / rowHeight) + 2 * OVERSCAN;
+        const last = Math.min(rows.length, first + visible);
+        if (first === rendered[0] && last === rendered[1]) {
+            return;
+        }
+        rendered = [first, last];
+
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(spacer(first * rowHeight));
+        for (let i = first; i < last; i++) {
+            const book = rows[i];
+            const tr = document.createElement('tr');
+            tr.className = 'book-row' + (i === selectedIndex ? ' selected' : '');
+            tr.dataset.index = i;
+            cell(tr, String(i + 1));
+            cell(tr, cover(book));
+            cell(tr, book[0]);
+            cell(tr, book[1]);
+            cell(tr, book[2]);
+            cell(tr, book[3]);
+            fragment.appendChild(tr);
+        }
+        fragment.appendChild(spacer((rows.length - last) * rowHeight));
+        tbody.replaceChildren(fragment);
+
+        const sample = tbody.querySelector('.book-row');
+        if (sample && sample.offsetHeight && sample.offsetHeight !== rowHeight) {
+            rowHeight = sample.offsetHeight;
+            rendered = [-1, -1];
+            renderWindow();
+        }
+    }
+
+    function showBookDetails(index) {
+        const detailsDiv = document.getElementById('bookDetails_' + uniqueId);
+        const contentDiv = document.getElementById('detailsContent_' + uniqueId);
+        const book = rows[index];
+        selectedIndex = index;
+        tbody.querySelectorAll('.book-row').forEach(function(r) {
+            r.classList.toggle('selected', Number(r.dataset.index) === index);
+        });
+
+        contentDiv.replaceChildren();
+        if (book[4]) {
+            const img = document.createElement('img');
+            img.className = 'cover-large';
+            img.alt = book[0];
+            img.src = book[4];
+            contentDiv.appendChild(img);
+        }
+        const title = document.createElement('h3');
+        title.textContent = book[0];
+        contentDiv.appendChild(title);
+        [['Authors:', book[1]], ['Publisher:', book[2]], ['Published Date:', book[3]]].forEach(function(pair) {
+            const label = document.createElement('div');
+            label.className = 'info-label';
+            label.textContent = pair[0];
+            const value = document.createElement('div');
+            value.className = 'info-value';
+            value.textContent = pair[1];
+            contentDiv.appendChild(label);
+            contentDiv.appendChild(value);
+        });
+        const label = document.createElement('div');
+        label.className = 'info-label';
+        label.textContent = 'Description:';
+        const description = document.createElement('div');
+        description.className = 'description';
+        description.textContent = 'Loading...';
+        contentDiv.appendChild(label);
+        contentDiv.appendChild(description);
+        detailsDiv.classList.add('visible');
+
+        getDescriptions().then(function(all) {
+            if (selectedIndex === index) {
+                description.textContent = all[index];
+            }
+        }).catch(function(error) {
+            console.error('Could not decode descriptions for ID:', uniqueId, error);
+            description.textContent = 'Description unavailable';
+        });
+    }
+
+    function closeDetails() {
+        document.getElementById('bookDetails_' + uniqueId).classList.remove('visible');
+        selectedIndex = -1;
+        tbody.querySelectorAll('.book-row').forEach(r => r.classList.remove('selected'));
+    }
+
+    function attachEventListeners() {
+        renderWindow();
+        container.addEventListener('scroll', function() {
+            window.requestAnimationFrame(renderWindow);
+        });
+        tbody.addEventListener('click', function(event) {
+            const row = event.target.closest('.book-row');
+            if (row) {
+                showBookDetails(Number(row.dataset.index));
+            }
+        });
+        const closeBtn = document.querySelector('.close-details[data-unique-id="' + uniqueId + '"]');
+        if (closeBtn) {
+            closeBtn.addEventListener('click', closeDetails);
+        }
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', attachEventListeners);
+    } else {
+        attachEventListeners();
+    }
+};
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+import httpx
+
+from models.config import BookInfoConfig
+from services.google_books_service import GoogleBooksService
+from services.response_cache import ResponseCache
+
+TOTAL_ITEMS = 30
+
+
+def _page(start_index: int, max_results: int) -> dict:
+    count = max(0, min(max_results, TOTAL_ITEMS - start_index))
+    return {
+        "totalItems": TOTAL_ITEMS,
+        "items": [
+            {"id": f"book-{start_index + i}", "volumeInfo": {"title": f"Book {start_index + i}"}}
+            for i in range(count)
+        ],
+    }
+
+
+class _Response:
+    def __init__(self, data: dict) -> None:
+        self._data = data
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return self._data
+
+
+class _Session:
+    """Stands in for requests.Session, recording the requested start indices."""
+
+    def __init__(self) -> None:
+        self.starts: list[int] = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params, timeout):
+        with self._lock:
+            self.starts.append(params["startIndex"])
+        return _Response(_page(params["startIndex"], params["maxResults"]))
+
+
+def _config() -> BookInfoConfig:
+    # Paging settings are left at their defaults: 100 results in pages of 40,
+    # fetched three at a time
+    return BookInfoConfig(cache_enabled=False)
+
+
+def test_default_search_skips_pages_past_total_items():
+    session = _Session()
+    books = GoogleBooksService(_config(), session=session).search(keywords="rockets")
+
+    assert session.starts == [0]
+    assert len(books) == TOTAL_ITEMS
+
+
+def test_async_default_search_skips_pages_past_total_items():
+    starts: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params["startIndex"])
+        starts.append(start)
+        return httpx.Response(200, json=_page(start, int(request.url.params["maxResults"])))
+
+    async def search():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = GoogleBooksService(_config(), async_client=client)
+            return await service.asearch(keywords="rockets")
+
+    books = asyncio.run(search())
+
+    assert starts == [0]
+    assert len(books) == TOTAL_ITEMS
+
+
+def test_cached_first_page_bounds_the_remaining_fetches(tmp_path):
+    config = _config()
+    cache = ResponseCache(tmp_path, ttl=60, stale_ttl=60, max_bytes=1 << 20)
+    service = GoogleBooksService(config, session=_Session(), cache=cache)
+    first = {**_page(0, config.max_allowed_results), "totalItems": 50}
+    cache.set(service._cache_key("rockets", 0, config.max_allowed_results), first)
+
+    service.search(keywords="rockets")
+
+    assert service._session.starts == [40]
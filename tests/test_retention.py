@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("chromadb")
+
+from models.config import AppConfig
+from utils.file_manager import FileManager
+from utils.lexical_index import LexicalIndex
+from utils.retention import RetentionManager
+from utils.vector_store import VectorStore
+
+
+def test_sweep_prunes_dead_keys_in_a_real_collection(tmp_path):
+    config = AppConfig(
+        chroma_persist_path=str(tmp_path / "chroma"),
+        embedding_cache_enabled=False,
+    )
+    file_manager = FileManager(tmp_path)
+    file_manager.write_json("search_live.json", [{"title": "Kept"}])
+    store = VectorStore(config)
+    lexical_index = LexicalIndex()
+
+    ids = ["kept", "orphan"]
+    documents = ["rockets and orbits", "rockets for beginners"]
+    metadatas = [
+        {"title": "Kept", "search:live": True, "search:gone": True, "session:ended": True},
+        {"title": "Orphan", "search:gone": True},
+    ]
+    store.collection.add(
+        ids=ids, documents=documents, metadatas=metadatas, embeddings=[[0.0, 1.0], [1.0, 0.0]]
+    )
+    lexical_index.add(ids, documents, metadatas)
+
+    result = RetentionManager(file_manager, store, lexical_index, config).sweep()
+
+    assert (result.deleted_vectors, result.pruned_vectors) == (1, 1)
+    stored = store.collection.get(include=["metadatas"])
+    assert stored["ids"] == ["kept"]
+    assert stored["metadatas"][0] == {
+        "title": "Kept",
+        "search:live": True,
+        "search:gone": False,
+        "session:ended": False,
+    }
+    assert store.collection.get(where={"search:gone": True})["ids"] == []
+    assert lexical_index.search("rockets", 10, {"search:gone": True}) == []
+    assert [doc_id for doc_id, _ in lexical_index.search("rockets", 10, {"search:live": True})] == ["kept"]
+
+    # A second sweep finds nothing left to prune
+    result = RetentionManager(file_manager, store, lexical_index, config).sweep()
+    assert (result.deleted_vectors, result.pruned_vectors) == (0, 0)
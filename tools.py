@@ -49,22 +49,40 @@ class Assistant:
     def __init__(self, runnable: Runnable):
         self.runnable = runnable
 
+    @staticmethod
+    def _prepare(state: State, config: RunnableConfig) -> dict:
+        configuration = config.get("configurable", {})
+        passenger_id = configuration.get("passenger_id", None)
+        return {**state, "user_info": passenger_id}
+
+    @staticmethod
+    def _is_empty(result) -> bool:
+        return not result.tool_calls and (
+            not result.content
+            or isinstance(result.content, list)
+            and not result.content[0].get("text")
+        )
+
     def __call__(self, state: State, config: RunnableConfig):
+        state = self._prepare(state, config)
         while True:
-            configuration = config.get("configurable", {})
-            passenger_id = configuration.get("passenger_id", None)
-            state = {**state, "user_info": passenger_id}
-            result = self.runnable.invoke(state)
+            # Pass the node config on so run callbacks (e.g. token streaming) reach the LLM
+            result = self.runnable.invoke(state, config)
             # If the LLM happens to return an empty response, we will re-prompt it
             # for an actual response.
-            if not result.tool_calls and (
-                not result.content
-                or isinstance(result.content, list)
-                and not result.content[0].get("text")
-            ):
-                messages = state["messages"] + [("user", "Respond with a real output.")]
-                state = {**state, "messages": messages}
-            else:
+            if not self._is_empty(result):
                 break
+            messages = state["messages"] + [("user", "Respond with a real output.")]
+            state = {**state, "messages": messages}
         return {"messages": result}
 
+    async def acall(self, state: State, config: RunnableConfig):
+        """Async counterpart of __call__, used when the graph runs via ainvoke/astream."""
+        state = self._prepare(state, config)
+        while True:
+            result = await self.runnable.ainvoke(state, config)
+            if not self._is_empty(result):
+                break
+            messages = state["messages"] + [("user", "Respond with a real output.")]
+            state = {**state, "messages": messages}
+        return {"messages": result}
@@ -0,0 +1,142 @@
+"""Persistent embedding cache wrapped around a Chroma embedding function."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed map of document hash to embedding vector.
+
+    Vectors are stored as float32 blobs. When the cache grows beyond
+    `max_entries`, the least recently used vectors are dropped.
+    """
+
+    def __init__(self, path: Path | str, max_entries: int = 100_000) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "hash TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_many(self, hashes: list[str]) -> dict[str, list[float]]:
+        """Return cached vectors for the given hashes, marking them as used."""
+        if not hashes:
+            return {}
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE hash = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(hashes) - len(found)
+        return found
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        """Store vectors and evict the least recently used ones past the size bound."""
+        if not vectors:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, vector, last_used) VALUES (?, ?, ?)",
+                [(key, array("f", vec).tobytes(), now) for key, vec in vectors.items()],
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE hash IN ("
+                    "SELECT hash FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self._stats["evictions"] += excess
+            self._conn.commit()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and current entry count."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            return {**self._stats, "entries": count}
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Embedding function that serves previously seen documents from an EmbeddingCache.
+
+    Only documents missing from the cache are passed to the wrapped function,
+    in a single batched call.
+    """
+
+    def __init__(
+        self,
+        embedding_function: EmbeddingFunction[Documents],
+        cache: EmbeddingCache,
+        model_key: str | None = None,
+    ) -> None:
+        self._embedding_function = embedding_function
+        self._cache = cache
+        # Namespace hashes by model so switching models never returns stale vectors
+        self._model_key = model_key or type(embedding_function).__name__
+
+    @property
+    def uncached(self) -> EmbeddingFunction[Documents]:
+        """The wrapped embedding function, bypassing the cache."""
+        return self._embedding_function
+
+    def _hash(self, document: str) -> str:
+        return hashlib.sha256(f"{self._model_key}\0{document}".encode("utf-8")).hexdigest()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        hashes = [self._hash(doc) for doc in input]
+        vectors = self._cache.get_many(list(dict.fromkeys(hashes)))
+
+        missing: dict[str, str] = {}
+        for key, doc in zip(hashes, input):
+            if key not in vectors:
+                missing.setdefault(key, doc)
+
+        if missing:
+            computed = self._embedding_function(list(missing.values()))
+            new_vectors = {
+                key: [float(x) for x in vec] for key, vec in zip(missing, computed)
+            }
+            self._cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors[key] for key in hashes]
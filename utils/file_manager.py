@@ -1,36 +1,338 @@
-"""File I/O operations for JSON data."""
+"""Storage for search results and presentation data.
+
+Data is kept in a single SQLite database (WAL mode) instead of one JSON file
+per search/token. The public API still addresses entries by their historical
+filenames (e.g. "search_<id>.json", "<token>.json"), and legacy JSON files
+found in the base directory are imported on first access.
+
+List items are stored in a compact binary form: the field names of each record
+shape are kept once in a `schemas` table, and each item holds a 2-byte schema id
+followed by its zlib-compressed values. Items written by older versions as JSON
+text are still read, and `migrate` converts them. `export_json` writes the old
+indented JSON for debugging.
+
+This is not a columnar file format with its own offset index. The encoding is
+row-wise: each item is compressed on its own, which roughly halves a typical
+book (about 1 KB of JSON becomes 450-500 bytes) but compresses worse than
+per-field columns would. Random access comes from the items table instead: its
+(name, position) primary key acts as the offset index and SQLite reads pages
+through a memory map, so a rank lookup or a first-N slice reads and decodes
+only the requested items.
+
+Full reads are kept in a bounded in-process LRU cache of parsed lists, which
+also serves slices and counts of lists it already holds; callers always get
+their own copies. Every write bumps a per-entry version in the database, so
+cached lists are invalidated even when another process or FileManager
+instance wrote them.
+
+Reads record a (throttled) access time per entry, and the `refs` table lets
+callers hold entries that must survive garbage collection; see utils.retention.
+
+Usage:
+    python -m utils.file_manager migrate
+    python -m utils.file_manager export <filename> [output.json]
+"""
 
 import json
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 from models.book import BookModel
 
+DB_FILENAME = "book_assistant.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    is_list INTEGER NOT NULL,
+    data TEXT,
+    updated_at REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    accessed_at REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (name, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS schemas (
+    id INTEGER PRIMARY KEY,
+    fields TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS refs (
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    held_at REAL NOT NULL,
+    PRIMARY KEY (owner, name)
+) WITHOUT ROWID;
+"""
+
+# Columns added to documents after the first release, with their migrations
+_DOCUMENT_COLUMNS = {
+    "version": "ALTER TABLE documents ADD COLUMN version INTEGER NOT NULL DEFAULT 0",
+    "accessed_at": "ALTER TABLE documents ADD COLUMN accessed_at REAL",
+}
+# Minimum seconds between access-time updates of the same entry
+_TOUCH_INTERVAL = 60.0
+
+_SCHEMA_ID = struct.Struct(">H")
+# Let SQLite read pages through a memory map instead of read() calls
+_MMAP_SIZE = 256 * 1024 * 1024
+
+
+_NEXT_VERSION = "COALESCE((SELECT version FROM documents WHERE name = ?), 0) + 1"
+
+
+def _copy_book(book: dict[str, Any]) -> dict[str, Any]:
+    """Copy of a cached book that shares no mutable values with it."""
+    return {key: list(value) if isinstance(value, list) else value for key, value in book.items()}
+
+
+@dataclass(frozen=True)
+class StoredEntry:
+    """Size and timestamps of one stored entry."""
+
+    name: str
+    size_bytes: int
+    updated_at: float
+    accessed_at: float
+
 
 class FileManager:
-    """Handles reading and writing JSON files for book data."""
+    """Handles reading and writing JSON data for book searches and tokens."""
 
-    def __init__(self, base_path: Path | str | None = None) -> None:
+    def __init__(self, base_path: Path | str | None = None, cache_size: int = 64) -> None:
         self.base_path = Path(base_path) if base_path else Path.cwd()
+        self.db_path = self.base_path / DB_FILENAME
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+        for column, migration in _DOCUMENT_COLUMNS.items():
+            if column not in columns:
+                conn.execute(migration)
+
+        self.cache_size = cache_size
+        # filename -> (version, parsed books), least recently used first; never handed out
+        self._cache: OrderedDict[str, tuple[int, tuple[dict[str, Any], ...]]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+        self._schema_ids: dict[str, int] = {}
+        self._schema_fields: dict[int, tuple[str, ...]] = {}
+        self._touched: dict[str, float] = {}
 
     def _resolve_path(self, filename: str) -> Path:
-        """Resolve filename to full path."""
+        """Resolve filename to full path (used for legacy JSON files)."""
         return self.base_path / filename
 
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection; SQLite handles cross-process locking."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, write: bool = True) -> "_Transaction":
+        return _Transaction(self._connection(), write)
+
+    def _schema_id(self, fields: tuple[str, ...]) -> int:
+        """Id of a record shape, registering it on first use (outside any transaction)."""
+        key = json.dumps(fields)
+        schema_id = self._schema_ids.get(key)
+        if schema_id is None:
+            conn = self._connection()
+            conn.execute("INSERT OR IGNORE INTO schemas (fields) VALUES (?)", (key,))
+            (schema_id,) = conn.execute(
+                "SELECT id FROM schemas WHERE fields = ?", (key,)
+            ).fetchone()
+            self._schema_ids[key] = schema_id
+            self._schema_fields[schema_id] = fields
+        return schema_id
+
+    def _fields(self, schema_id: int) -> tuple[str, ...]:
+        fields = self._schema_fields.get(schema_id)
+        if fields is None:
+            row = (
+                self._connection()
+                .execute("SELECT fields FROM schemas WHERE id = ?", (schema_id,))
+                .fetchone()
+            )
+            if row is None:
+                raise ValueError(f"Unknown record schema {schema_id}")
+            fields = tuple(json.loads(row[0]))
+            self._schema_fields[schema_id] = fields
+        return fields
+
+    def _encode(self, item: dict[str, Any] | BookModel) -> bytes:
+        """Encode one list item as schema id + compressed positional values."""
+        if isinstance(item, BookModel):
+            item = item.to_dict()
+        schema_id = self._schema_id(tuple(item))
+        values = json.dumps(list(item.values()), separators=(",", ":")).encode()
+        return _SCHEMA_ID.pack(schema_id) + zlib.compress(values)
+
+    def _decode(self, data: bytes | str) -> dict[str, Any]:
+        """Decode one list item; JSON text rows from older versions are read as-is."""
+        if isinstance(data, str):
+            return json.loads(data)
+        (schema_id,) = _SCHEMA_ID.unpack_from(data)
+        values = json.loads(zlib.decompress(data[_SCHEMA_ID.size :]))
+        return dict(zip(self._fields(schema_id), values))
+
+    def _import_legacy(self, filename: str) -> bool:
+        """Import a legacy JSON file from base_path into the database, if present."""
+        path = self._resolve_path(filename)
+        if not path.is_file():
+            return False
+        with open(path, "r") as f:
+            data = json.load(f)
+        self.write_json(filename, data)
+        return True
+
+    def _exists(self, filename: str) -> bool:
+        """Check the database only (no legacy file fallback)."""
+        return (
+            self._connection()
+            .execute("SELECT 1 FROM documents WHERE name = ?", (filename,))
+            .fetchone()
+            is not None
+        )
+
+    def _ensure_stored(self, filename: str) -> bool:
+        """Return True if filename is in the database, importing a legacy file if needed."""
+        return self._exists(filename) or self._import_legacy(filename)
+
+    def _touch(self, filename: str) -> None:
+        """Record an access for LRU retention, at most once per _TOUCH_INTERVAL."""
+        now = time.time()
+        if now - self._touched.get(filename, 0.0) < _TOUCH_INTERVAL:
+            return
+        self._touched[filename] = now
+        self._connection().execute(
+            "UPDATE documents SET accessed_at = ? WHERE name = ?", (now, filename)
+        )
+
+    def _version(self, filename: str) -> int | None:
+        """Current write version of an entry, or None if it is not stored."""
+        row = (
+            self._connection()
+            .execute("SELECT version FROM documents WHERE name = ?", (filename,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _cached_books(self, filename: str) -> tuple[dict[str, Any], ...] | None:
+        """Return cached books if the stored version still matches."""
+        version = self._version(filename)
+        with self._cache_lock:
+            entry = self._cache.get(filename)
+            if entry is None:
+                self._cache_stats["misses"] += 1
+                return None
+            if entry[0] != version:
+                del self._cache[filename]
+                self._cache_stats["invalidations"] += 1
+                self._cache_stats["misses"] += 1
+                return None
+            self._cache.move_to_end(filename)
+            self._cache_stats["hits"] += 1
+            return entry[1]
+
+    def _cache_books(
+        self, filename: str, version: int, books: list[dict[str, Any]]
+    ) -> tuple[dict[str, Any], ...]:
+        """Store parsed books in the LRU cache."""
+        cached = tuple(books)
+        if self.cache_size <= 0:
+            return cached
+        with self._cache_lock:
+            self._cache[filename] = (version, cached)
+            self._cache.move_to_end(filename)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._cache_stats["evictions"] += 1
+        return cached
+
+    def _load_books(self, filename: str) -> tuple[dict[str, Any], ...]:
+        """
+        Parsed books of a stored list, from the cache or read and cached on a miss.
+
+        Raises:
+            FileNotFoundError: If no data is stored under filename
+            ValueError: If the stored data is not a list
+        """
+        cached = self._cached_books(filename)
+        if cached is not None:
+            return cached
+
+        if not self._ensure_stored(filename):
+            raise FileNotFoundError(filename)
+        with self._transaction(write=False) as conn:
+            row = conn.execute(
+                "SELECT is_list, version FROM documents WHERE name = ?", (filename,)
+            ).fetchone()
+            if row is None:
+                raise FileNotFoundError(filename)
+            is_list, version = row
+            if not is_list:
+                raise ValueError(f"Expected list of books, got {dict}")
+            rows = conn.execute(
+                "SELECT data FROM items WHERE name = ? ORDER BY position", (filename,)
+            ).fetchall()
+        return self._cache_books(filename, version, [self._decode(item) for (item,) in rows])
+
+    def cache_stats(self) -> dict[str, float]:
+        """Return parsed-result cache counters and hit rate."""
+        with self._cache_lock:
+            lookups = self._cache_stats["hits"] + self._cache_stats["misses"]
+            return {
+                **self._cache_stats,
+                "entries": len(self._cache),
+                "hit_rate": self._cache_stats["hits"] / lookups if lookups else 0.0,
+            }
+
     def read_json(self, filename: str) -> list[dict[str, Any]] | dict[str, Any]:
         """
-        Read JSON from file.
+        Read stored JSON data.
 
         Returns:
             Parsed JSON data (list or dict)
 
         Raises:
-            FileNotFoundError: If file does not exist
-            json.JSONDecodeError: If file contains invalid JSON
+            FileNotFoundError: If no data is stored under filename
+            json.JSONDecodeError: If stored data is invalid JSON
         """
-        path = self._resolve_path(filename)
-        with open(path, "r") as f:
-            return json.load(f)
+        if not self._ensure_stored(filename):
+            raise FileNotFoundError(filename)
+        self._touch(filename)
+
+        # One read transaction so a concurrent rewrite is never seen half-applied
+        with self._transaction(write=False) as conn:
+            row = conn.execute(
+                "SELECT is_list, data FROM documents WHERE name = ?", (filename,)
+            ).fetchone()
+            if row is None:
+                raise FileNotFoundError(filename)
+            is_list, data = row
+            if not is_list:
+                return json.loads(data)
+            rows = conn.execute(
+                "SELECT data FROM items WHERE name = ? ORDER BY position", (filename,)
+            ).fetchall()
+        return [self._decode(item) for (item,) in rows]
 
     def write_json(
         self,
@@ -38,36 +340,267 @@ class FileManager:
         data: list[dict[str, Any]] | dict[str, Any] | list[BookModel],
     ) -> None:
         """
-        Write data to JSON file.
+        Atomically store data, replacing anything under the same filename.
 
         Args:
             filename: Target filename
             data: Data to serialize (list of dicts, dict, or list of BookModel)
         """
-        path = self._resolve_path(filename)
-        if isinstance(data, list) and data and isinstance(data[0], BookModel):
-            serializable = [b.to_dict() for b in data]
-        else:
-            serializable = data
-        with open(path, "w") as f:
-            json.dump(serializable, f, indent=2)
+        now = time.time()
+        if isinstance(data, list):
+            rows = [(filename, i, self._encode(item)) for i, item in enumerate(data)]
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM items WHERE name = ?", (filename,))
+            if isinstance(data, list):
+                conn.executemany(
+                    "INSERT INTO items (name, position, data) VALUES (?, ?, ?)", rows
+                )
+                document = (filename, 1, None, now, filename, now)
+            else:
+                document = (filename, 0, json.dumps(data), now, filename, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(name, is_list, data, updated_at, version, accessed_at) "
+                f"VALUES (?, ?, ?, ?, {_NEXT_VERSION}, ?)",
+                document,
+            )
+
+    def append_books_json(self, filename: str, books: list[BookModel]) -> None:
+        """
+        Append books to a stored list, creating it if needed.
+
+        The existing contents are not re-read, so a list can be written
+        incrementally one batch at a time.
+
+        Args:
+            filename: Target filename
+            books: Books to append
+        """
+        if not books:
+            return
+        now = time.time()
+        encoded = [self._encode(book) for book in books]
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT is_list FROM documents WHERE name = ?", (filename,)
+            ).fetchone()
+            if row is not None and not row[0]:
+                raise ValueError(f"Expected list of books in {filename}")
+            (last,) = conn.execute(
+                "SELECT COALESCE(MAX(position), -1) FROM items WHERE name = ?", (filename,)
+            ).fetchone()
+            conn.executemany(
+                "INSERT INTO items (name, position, data) VALUES (?, ?, ?)",
+                [(filename, last + 1 + i, data) for i, data in enumerate(encoded)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(name, is_list, data, updated_at, version, accessed_at) "
+                f"VALUES (?, 1, NULL, ?, {_NEXT_VERSION}, ?)",
+                (filename, now, filename, now),
+            )
 
     def file_exists(self, filename: str) -> bool:
-        """Check if file exists."""
-        return self._resolve_path(filename).exists()
+        """Check if data is stored under filename."""
+        return self._exists(filename) or self._resolve_path(filename).is_file()
+
+    def list_files(self, prefix: str = "") -> list[str]:
+        """Return stored filenames starting with prefix."""
+        rows = self._connection().execute(
+            "SELECT name FROM documents WHERE name >= ? AND name < ? ORDER BY name",
+            (prefix, prefix + "\uffff"),
+        ).fetchall()
+        return [name for (name,) in rows]
 
     def read_books_json(self, filename: str) -> list[dict[str, Any]]:
         """
-        Read JSON file expected to contain list of book objects.
+        Read stored data expected to contain list of book objects.
+
+        Results are served from the parsed-result cache while the stored
+        version is unchanged.
 
         Returns:
-            List of book dictionaries
+            List of book dicts (copies; changing them does not affect the cache)
 
         Raises:
-            FileNotFoundError: If file does not exist
-            json.JSONDecodeError: If file contains invalid JSON
+            FileNotFoundError: If no data is stored under filename
+            json.JSONDecodeError: If stored data is invalid JSON
+        """
+        books = self._load_books(filename)
+        self._touch(filename)
+        return [_copy_book(book) for book in books]
+
+    def read_books_slice(
+        self, filename: str, offset: int = 0, count: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Read `count` books starting at `offset`.
+
+        Served from the parsed-result cache when the list is already cached;
+        otherwise only the requested items are read, through the position
+        index, and decoded.
+
+        Raises:
+            FileNotFoundError: If no data is stored under filename
+        """
+        cached = self._cached_books(filename) if self.cache_size > 0 else None
+        if cached is not None:
+            self._touch(filename)
+            end = None if count is None else offset + count
+            return [_copy_book(book) for book in cached[offset:end]]
+
+        if not self._ensure_stored(filename):
+            raise FileNotFoundError(filename)
+        self._touch(filename)
+        rows = self._connection().execute(
+            "SELECT data FROM items WHERE name = ? AND position >= ? "
+            "ORDER BY position LIMIT ?",
+            (filename, offset, -1 if count is None else count),
+        ).fetchall()
+        return [self._decode(item) for (item,) in rows]
+
+    def count_books(self, filename: str) -> int:
+        """Number of books stored under filename (0 if missing), counted without decoding them."""
+        cached = self._cached_books(filename) if self.cache_size > 0 else None
+        if cached is not None:
+            return len(cached)
+        if not self._ensure_stored(filename):
+            return 0
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM items WHERE name = ?", (filename,)
+        ).fetchone()
+        return count
+
+    def entry_stats(self) -> list[StoredEntry]:
+        """Size and timestamps of every stored entry."""
+        rows = self._connection().execute(
+            "SELECT d.name, COALESCE(length(d.data), 0) + COALESCE(SUM(length(i.data)), 0), "
+            "d.updated_at, COALESCE(d.accessed_at, d.updated_at) "
+            "FROM documents d LEFT JOIN items i ON i.name = d.name GROUP BY d.name"
+        ).fetchall()
+        return [StoredEntry(*row) for row in rows]
+
+    def delete(self, filenames: list[str]) -> None:
+        """Delete stored entries and any legacy JSON files with the same names."""
+        with self._transaction() as conn:
+            for filename in filenames:
+                conn.execute("DELETE FROM items WHERE name = ?", (filename,))
+                conn.execute("DELETE FROM documents WHERE name = ?", (filename,))
+        with self._cache_lock:
+            for filename in filenames:
+                self._cache.pop(filename, None)
+        for filename in filenames:
+            self._touched.pop(filename, None)
+            self._resolve_path(filename).unlink(missing_ok=True)
+
+    def hold_references(self, owner: str, filenames: Iterable[str] = ()) -> None:
+        """
+        Mark entries as in use by owner (e.g. a chat session) and renew its existing holds.
+
+        Args:
+            owner: Holder id
+            filenames: Entries to add to the owner's holds
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE refs SET held_at = ? WHERE owner = ?", (now, owner))
+            conn.executemany(
+                "INSERT OR REPLACE INTO refs (owner, name, held_at) VALUES (?, ?, ?)",
+                [(owner, filename, now) for filename in filenames],
+            )
+
+    def release_references(self, owner: str) -> None:
+        """Drop every hold of owner."""
+        self._connection().execute("DELETE FROM refs WHERE owner = ?", (owner,))
+
+    def held_names(self, max_age: float | None = None) -> set[str]:
+        """
+        Entries currently held by any owner.
+
+        Args:
+            max_age: Holds not renewed within this many seconds are dropped first
+        """
+        with self._transaction() as conn:
+            if max_age is not None:
+                conn.execute("DELETE FROM refs WHERE held_at < ?", (time.time() - max_age,))
+            rows = conn.execute("SELECT DISTINCT name FROM refs").fetchall()
+        return {name for (name,) in rows}
+
+    def held_owners(self) -> set[str]:
+        """Owners holding at least one entry (see held_names for expiring abandoned holds)."""
+        rows = self._connection().execute("SELECT DISTINCT owner FROM refs").fetchall()
+        return {owner for (owner,) in rows}
+
+    def export_json(self, filename: str, path: Path | str | None = None) -> Path:
+        """
+        Write a stored entry as indented JSON, the format used before the database.
+
+        Args:
+            filename: Stored filename to export
+            path: Output path (defaults to filename in base_path)
+
+        Returns:
+            Path of the written file
         """
         data = self.read_json(filename)
-        if not isinstance(data, list):
-            raise ValueError(f"Expected list of books, got {type(data)}")
-        return data
+        path = Path(path) if path else self._resolve_path(filename)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def migrate(self) -> int:
+        """
+        Import legacy JSON files and re-encode JSON text items in the binary format.
+
+        Returns:
+            Number of entries imported or converted
+        """
+        migrated = 0
+        for path in sorted(self.base_path.glob("search_*.json")):
+            if not self._exists(path.name) and self._import_legacy(path.name):
+                migrated += 1
+
+        names = [
+            name
+            for (name,) in self._connection().execute(
+                "SELECT DISTINCT name FROM items WHERE typeof(data) = 'text'"
+            ).fetchall()
+        ]
+        for name in names:
+            # write_json keeps the entry atomic and bumps its version
+            self.write_json(name, self.read_json(name))
+            migrated += 1
+        return migrated
+
+
+class _Transaction:
+    """Context manager for a transaction; write transactions take the write lock up front."""
+
+    def __init__(self, conn: sqlite3.Connection, write: bool = True) -> None:
+        self.conn = conn
+        self.write = write
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE" if self.write else "BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    manager = FileManager()
+    if args == ["migrate"]:
+        print(f"Migrated {manager.migrate()} entries in {manager.db_path}")
+    elif len(args) in (2, 3) and args[0] == "export":
+        print(f"Exported to {manager.export_json(*args[1:])}")
+    else:
+        print(
+            "Usage: python -m utils.file_manager migrate\n"
+            "       python -m utils.file_manager export <filename> [output.json]"
+        )
+        sys.exit(1)
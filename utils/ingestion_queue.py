@@ -0,0 +1,162 @@
+"""Background queue that batches vector-store writes off the request path."""
+
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+ApplyFn = Callable[[list[str], list[str], list[dict]], object]
+
+
+@dataclass
+class _Job:
+    keys: frozenset[str]
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict]
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class IngestionQueue:
+    """
+    Single background worker that applies queued writes in coalesced batches.
+
+    Writes submitted close together (within `max_delay` seconds, up to
+    `max_batch` documents) are merged into one call to `apply`, so the
+    embedding function sees fewer, larger batches. Each submission carries
+    keys (search_id, session) so readers can wait for just the writes they need.
+    """
+
+    def __init__(
+        self,
+        apply: ApplyFn,
+        max_batch: int = 256,
+        max_delay: float = 0.05,
+    ) -> None:
+        self._apply = apply
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._pending: list[_Job] = []
+        self._in_flight: list[_Job] = []
+        self._thread: threading.Thread | None = None
+        self._stats = {"submitted": 0, "applied": 0, "batches": 0, "errors": 0}
+        atexit.register(self.flush, 30.0)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="vector-ingestion", daemon=True
+            )
+            self._thread.start()
+
+    def submit(
+        self,
+        keys: Iterable[str],
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict],
+    ) -> None:
+        """Queue documents for ingestion and return immediately."""
+        if not ids:
+            return
+        with self._cond:
+            self._pending.append(_Job(frozenset(keys), ids, documents, metadatas))
+            self._stats["submitted"] += len(ids)
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def _take_batch(self) -> list[_Job]:
+        """Wait for work, give it a moment to coalesce, and claim up to max_batch documents."""
+        with self._cond:
+            self._cond.wait_for(lambda: bool(self._pending))
+            deadline = self._pending[0].submitted_at + self.max_delay
+            while sum(len(j.ids) for j in self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            jobs: list[_Job] = []
+            size = 0
+            while self._pending and (not jobs or size + len(self._pending[0].ids) <= self.max_batch):
+                job = self._pending.pop(0)
+                jobs.append(job)
+                size += len(job.ids)
+            self._in_flight = jobs
+            return jobs
+
+    @staticmethod
+    def _merge(jobs: Iterable[_Job]) -> tuple[list[str], list[str], list[dict]]:
+        """
+        Merge jobs by id, matching what sequential writes would produce.
+
+        Metadata of repeated ids is merged with later submissions winning, since
+        the store merges metadata keys on update.
+        """
+        merged: dict[str, tuple[str, dict]] = {}
+        for job in jobs:
+            job_entries: dict[str, tuple[str, dict]] = {}
+            for doc_id, document, meta in zip(job.ids, job.documents, job.metadatas):
+                job_entries.setdefault(doc_id, (document, meta))
+            for doc_id, (document, meta) in job_entries.items():
+                if doc_id in merged:
+                    meta = {**merged[doc_id][1], **meta}
+                merged[doc_id] = (document, meta)
+        ids = list(merged)
+        return ids, [merged[i][0] for i in ids], [merged[i][1] for i in ids]
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._take_batch()
+            try:
+                ids, documents, metadatas = self._merge(jobs)
+                self._apply(ids, documents, metadatas)
+                applied, failed = len(ids), 0
+            except Exception:
+                logger.exception("Vector-store ingestion failed for %d jobs", len(jobs))
+                applied, failed = 0, 1
+            with self._cond:
+                self._in_flight = []
+                self._stats["applied"] += applied
+                self._stats["batches"] += 1
+                self._stats["errors"] += failed
+                self._cond.notify_all()
+
+    def wait(self, keys: Iterable[str] | None = None, timeout: float | None = None) -> bool:
+        """
+        Block until queued writes are applied.
+
+        Args:
+            keys: Only wait for writes submitted under these keys (all if None)
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if the relevant writes were applied, False on timeout
+        """
+        wanted = set(keys) if keys is not None else None
+
+        def _done() -> bool:
+            jobs = self._pending + self._in_flight
+            if wanted is None:
+                return not jobs
+            return not any(job.keys & wanted for job in jobs)
+
+        with self._cond:
+            return self._cond.wait_for(_done, timeout)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued write is applied."""
+        return self.wait(None, timeout)
+
+    def stats(self) -> dict[str, int]:
+        """Return submitted/applied/batch/error counters and queue depth."""
+        with self._cond:
+            return {
+                **self._stats,
+                "pending": sum(len(j.ids) for j in self._pending + self._in_flight),
+            }
@@ -0,0 +1,225 @@
+"""In-process BM25 inverted index over book documents."""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any
+
+_TOKEN_RE = re.compile(r"\w+")
+_ISBN_RE = re.compile(r"^(?:isbn:?)?\s*([0-9][0-9\- ]{8,}[0-9xX])$", re.IGNORECASE)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens used for both documents and queries."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def normalize_phrase(text: str) -> str:
+    """Collapse a title/author/ISBN to a canonical form for exact matching."""
+    return " ".join(tokenize(text))
+
+
+def isbn_key(text: str) -> str | None:
+    """Exact-match key for an ISBN (hyphens, spaces and an isbn: prefix ignored)."""
+    match = _ISBN_RE.match(text.strip())
+    if not match:
+        return None
+    return "isbn:" + re.sub(r"[^0-9X]", "", match.group(1).upper())
+
+
+def matches_where(meta: dict[str, Any], where: dict[str, Any] | None) -> bool:
+    """Evaluate a Chroma-style metadata filter against one metadata dict."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(meta, c) for c in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_where(meta, c) for c in condition):
+                return False
+            continue
+
+        value = meta.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$ne" and value == expected:
+                return False
+            if op == "$in" and value not in expected:
+                return False
+            if op == "$nin" and value in expected:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if op == "$gt" and not value > expected:
+                    return False
+                if op == "$gte" and not value >= expected:
+                    return False
+                if op == "$lt" and not value < expected:
+                    return False
+                if op == "$lte" and not value <= expected:
+                    return False
+    return True
+
+
+class LexicalIndex:
+    """
+    BM25 index keyed by the same ids as the vector store.
+
+    Adding an existing id replaces its document and merges its metadata,
+    mirroring Chroma's upsert/update behaviour. Titles, individual authors and
+    ISBNs are also kept in exact-match maps for known-item lookups.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._documents: dict[str, str] = {}
+        self._metadatas: dict[str, dict[str, Any]] = {}
+        self._lengths: dict[str, int] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._exact: dict[str, set[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def _exact_keys(self, meta: dict[str, Any]) -> set[str]:
+        keys = {normalize_phrase(str(meta.get("title", "")))}
+        keys.update(normalize_phrase(a) for a in str(meta.get("authors", "")).split(","))
+        if meta.get("isbn"):
+            keys.add(isbn_key(str(meta["isbn"])) or "")
+        keys.discard("")
+        return keys
+
+    def _remove_locked(self, doc_id: str) -> None:
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        for term in set(tokenize(document)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        for key in self._exact_keys(self._metadatas.get(doc_id, {})):
+            ids = self._exact.get(key)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._exact[key]
+        self._total_length -= self._lengths.pop(doc_id, 0)
+
+    def add(
+        self,
+        ids: list[str],
+        documents: list[str | None],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Insert or update documents; a None document keeps the indexed text."""
+        with self._lock:
+            for doc_id, document, meta in zip(ids, documents, metadatas):
+                merged_meta = {**self._metadatas.get(doc_id, {}), **(meta or {})}
+                if document is None:
+                    document = self._documents.get(doc_id)
+                    if document is None:
+                        continue
+                self._remove_locked(doc_id)
+
+                terms = tokenize(document)
+                self._documents[doc_id] = document
+                self._metadatas[doc_id] = merged_meta
+                self._lengths[doc_id] = len(terms)
+                self._total_length += len(terms)
+                for term, count in Counter(terms).items():
+                    self._postings.setdefault(term, {})[doc_id] = count
+                for key in self._exact_keys(merged_meta):
+                    self._exact.setdefault(key, set()).add(doc_id)
+
+    def remove(self, ids: list[str]) -> None:
+        """Drop documents from the index; unknown ids are ignored."""
+        with self._lock:
+            for doc_id in ids:
+                self._remove_locked(doc_id)
+                self._metadatas.pop(doc_id, None)
+
+    def get(self, doc_id: str) -> tuple[str, dict[str, Any]]:
+        """Return the indexed document and metadata for an id."""
+        with self._lock:
+            return self._documents[doc_id], self._metadatas[doc_id]
+
+    def exact_match(self, query: str, where: dict[str, Any] | None = None) -> list[str]:
+        """
+        Ids whose title, an author or ISBN equals the query (after normalization).
+
+        Matches are ordered best first by their BM25 score for the query (ties
+        by id), so truncating the list keeps the most relevant ones.
+        """
+        key = isbn_key(query) or normalize_phrase(query)
+        with self._lock:
+            ids = [i for i in self._exact.get(key, ()) if matches_where(self._metadatas[i], where)]
+            scores = self._scores_locked(set(tokenize(query)), ids)
+            return sorted(ids, key=lambda doc_id: (-scores.get(doc_id, 0.0), doc_id))
+
+    def _scores_locked(self, terms: set[str], only: list[str] | None = None) -> dict[str, float]:
+        """BM25 scores of documents containing any term, optionally limited to some ids."""
+        n_docs = len(self._documents)
+        if not n_docs or not terms:
+            return {}
+        avg_length = self._total_length / n_docs
+        allowed = set(only) if only is not None else None
+        scores: dict[str, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(
+        self,
+        query: str,
+        n_results: int,
+        where: dict[str, Any] | None = None,
+    ) -> list[tuple[str, float]]:
+        """
+        Rank documents by BM25 score.
+
+        Returns:
+            Up to n_results (id, score) pairs, best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            scores = self._scores_locked(terms)
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            results = []
+            for doc_id, score in ranked:
+                if matches_where(self._metadatas[doc_id], where):
+                    results.append((doc_id, score))
+                    if len(results) >= n_results:
+                        break
+            return results
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """Fuse several best-first id rankings into one using reciprocal rank fusion."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
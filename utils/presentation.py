@@ -0,0 +1,64 @@
+"""Resolve data view tokens to the books they display."""
+
+from typing import Any
+
+from models.presentation import PresentationRef
+from utils.file_manager import FileManager
+
+
+def _sort_books(books: list[dict[str, Any]], sort: str) -> list[dict[str, Any]]:
+    """Order books for display; ties keep search rank order."""
+    if sort == "rating":
+        return sorted(
+            books,
+            key=lambda b: (b.get("averageRating") is None, -(b.get("averageRating") or 0.0)),
+        )
+    if sort == "date":
+        dated = [b for b in books if b.get("publishedDate", "Unknown Date") != "Unknown Date"]
+        undated = [b for b in books if b.get("publishedDate", "Unknown Date") == "Unknown Date"]
+        return sorted(dated, key=lambda b: b["publishedDate"], reverse=True) + undated
+    if sort == "title":
+        return sorted(books, key=lambda b: str(b.get("title", "")).casefold())
+    return books
+
+
+def resolve_ref(ref: PresentationRef, file_manager: FileManager) -> list[dict[str, Any]]:
+    """
+    Read the books a presentation reference points at.
+
+    Rank order reads only the referenced slice; other orders sort the whole
+    search first.
+
+    Raises:
+        FileNotFoundError: If the referenced search does not exist
+    """
+    search_file = f"search_{ref.search_id}.json"
+    if ref.sort == "rank":
+        return file_manager.read_books_slice(search_file, ref.offset, ref.count)
+    books = _sort_books(file_manager.read_books_json(search_file), ref.sort)
+    return books[ref.offset : ref.offset + ref.count]
+
+
+def resolve_token(token: str, file_manager: FileManager) -> list[dict[str, Any]]:
+    """
+    Resolve a token value from <data_retrieved=...> to a list of book dicts.
+
+    Reference tokens are resolved against the stored search; older tokens
+    that name a stored copy ("<token>.json") are still supported.
+
+    Raises:
+        FileNotFoundError: If the referenced data does not exist
+        ValueError: If the stored data is not a list of books
+    """
+    ref = PresentationRef.from_token(token)
+    if ref is not None:
+        return resolve_ref(ref, file_manager)
+    return file_manager.read_books_json(f"{token}.json")
+
+
+def token_storage_name(token: str) -> str:
+    """Stored entry a token value depends on (its search, or a legacy stored copy)."""
+    ref = PresentationRef.from_token(token)
+    if ref is not None:
+        return f"search_{ref.search_id}.json"
+    return f"{token}.json"
@@ -0,0 +1,279 @@
+"""Retention and garbage collection for stored searches, tokens and vectors.
+
+Usage:
+    python -m utils.retention [--dry-run] [--compact]
+
+The CLI opens the vector store exclusively and refuses to run while the app
+is up: a separate process cannot update the app's lexical index or take its
+write lock. A running app sweeps itself in the background.
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from models.config import AppConfig
+from utils.file_manager import FileManager, StoredEntry
+from utils.lexical_index import LexicalIndex
+from utils.presentation import token_storage_name
+from utils.vector_store import StoreInUseError, VectorStore
+
+logger = logging.getLogger(__name__)
+
+_SEARCH_PREFIX = "search_"
+_SEARCH_SUFFIX = ".json"
+
+
+@dataclass
+class SweepResult:
+    """What one sweep deleted (or would delete, for a dry run)."""
+
+    deleted_entries: list[str] = field(default_factory=list)
+    freed_bytes: int = 0
+    deleted_vectors: int = 0
+    # Vector entries kept, but stripped of keys for swept searches and ended sessions
+    pruned_vectors: int = 0
+
+
+def _search_ids(meta: dict) -> set[str]:
+    """Searches a vector entry belongs to, from its membership keys."""
+    ids = {key[len("search:"):] for key, value in meta.items() if key.startswith("search:") and value}
+    if meta.get("search_id"):
+        ids.add(str(meta["search_id"]))
+    return ids
+
+
+def _dead_keys(meta: dict, live_searches: set[str], live_sessions: set[str]) -> list[str]:
+    """Membership keys of a vector entry naming swept searches or ended sessions."""
+    dead = []
+    for key, value in meta.items():
+        if not value:
+            continue
+        if key.startswith("search:") and key[len("search:"):] not in live_searches:
+            dead.append(key)
+        elif key.startswith("session:") and key[len("session:"):] not in live_sessions:
+            dead.append(key)
+    return dead
+
+
+class RetentionManager:
+    """
+    Deletes stored entries by TTL and a total-size budget, least recently
+    accessed first, then deletes vector entries no remaining search refers to.
+
+    Entries held by a live chat (see `hold`) are never collected. Holds that
+    are not renewed within the reference TTL are treated as abandoned, so a
+    crashed process cannot pin data forever.
+    """
+
+    def __init__(
+        self,
+        file_manager: FileManager,
+        vector_store: VectorStore | None = None,
+        lexical_index: LexicalIndex | None = None,
+        config: AppConfig | None = None,
+        write_lock: "threading.Lock | None" = None,
+    ) -> None:
+        self.file_manager = file_manager
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.config = config or AppConfig()
+        # Shared with vector writers so a book re-added by a new search is not deleted mid-sweep
+        if write_lock is None and vector_store is not None:
+            write_lock = vector_store.write_lock
+        self._write_lock = write_lock
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def hold(self, owner: str, tokens: Iterable[str] = ()) -> None:
+        """Keep the data behind tokens shown to owner, and renew owner's existing holds."""
+        self.file_manager.hold_references(owner, {token_storage_name(t) for t in tokens})
+
+    def hold_searches(self, owner: str, search_ids: Iterable[str]) -> None:
+        """Keep searches made by owner (a chat session) while it is alive."""
+        self.file_manager.hold_references(
+            owner, {f"{_SEARCH_PREFIX}{search_id}{_SEARCH_SUFFIX}" for search_id in search_ids}
+        )
+
+    def release(self, owner: str) -> None:
+        """Let everything held by owner be collected."""
+        self.file_manager.release_references(owner)
+
+    def plan(self) -> list[StoredEntry]:
+        """Entries the next sweep would delete, expired ones first."""
+        now = time.time()
+        held = self.file_manager.held_names(self.config.retention_reference_ttl_seconds or None)
+        entries = self.file_manager.entry_stats()
+        ttl = self.config.retention_ttl_seconds
+        budget = self.config.retention_max_bytes
+
+        total = sum(e.size_bytes for e in entries)
+        evict = []
+        # Least recently accessed first, so expired entries come before budget evictions
+        for entry in sorted(entries, key=lambda e: e.accessed_at):
+            if entry.name in held:
+                continue
+            expired = ttl and now - entry.accessed_at > ttl
+            if expired or (budget and total > budget):
+                evict.append(entry)
+                total -= entry.size_bytes
+        return evict
+
+    def sweep(self, dry_run: bool = False) -> SweepResult:
+        """
+        Delete expired and over-budget entries, then orphaned vector entries.
+
+        Args:
+            dry_run: Report what would be deleted without deleting it
+        """
+        evict = self.plan()
+        result = SweepResult(
+            deleted_entries=[e.name for e in evict],
+            freed_bytes=sum(e.size_bytes for e in evict),
+        )
+        if not dry_run and evict:
+            self.file_manager.delete(result.deleted_entries)
+
+        if self.vector_store is not None:
+            swept = {self._search_id(name) for name in result.deleted_entries} if dry_run else set()
+            result.deleted_vectors, result.pruned_vectors = self._sweep_vectors(swept, dry_run)
+
+        logger.info(
+            "Retention sweep%s: %d entries (%d bytes), %d vectors deleted, %d pruned",
+            " (dry run)" if dry_run else "",
+            len(result.deleted_entries),
+            result.freed_bytes,
+            result.deleted_vectors,
+            result.pruned_vectors,
+        )
+        return result
+
+    @staticmethod
+    def _search_id(name: str) -> str | None:
+        if name.startswith(_SEARCH_PREFIX) and name.endswith(_SEARCH_SUFFIX):
+            return name[len(_SEARCH_PREFIX) : -len(_SEARCH_SUFFIX)]
+        return None
+
+    def _live_scopes(self, swept: set[str]) -> tuple[set[str], set[str]]:
+        """Ids of stored searches (minus swept ones) and of sessions still holding data."""
+        searches = {self._search_id(name) for name in self.file_manager.list_files(_SEARCH_PREFIX)}
+        searches.discard(None)
+        return searches - swept, self.file_manager.held_owners()
+
+    def _sweep_vectors(
+        self, swept: set[str], dry_run: bool, batch_size: int = 1000
+    ) -> tuple[int, int]:
+        """
+        Delete vector entries whose searches have all been collected, and strip
+        keys of collected searches and ended sessions from the rest.
+
+        Returns:
+            (deleted, pruned) entry counts; a dry run only counts deletions
+        """
+
+        def _classify(ids, metadatas, live_searches, live_sessions):
+            orphans, stale = [], {}
+            for doc_id, meta in zip(ids, metadatas):
+                meta = meta or {}
+                searches = _search_ids(meta)
+                # Entries without any search membership are left alone
+                if searches and not searches & live_searches:
+                    orphans.append(doc_id)
+                elif dead := _dead_keys(meta, live_searches, live_sessions):
+                    stale[doc_id] = dead
+            return orphans, stale
+
+        live_searches, live_sessions = self._live_scopes(swept)
+        collection = self.vector_store.collection
+        candidates: list[str] = []
+        orphan_count = 0
+        offset = 0
+        while True:
+            batch = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if not batch["ids"]:
+                break
+            orphans, stale = _classify(batch["ids"], batch["metadatas"], live_searches, live_sessions)
+            orphan_count += len(orphans)
+            candidates.extend(orphans)
+            candidates.extend(stale)
+            offset += len(batch["ids"])
+        if dry_run or not candidates:
+            return orphan_count, 0
+
+        deleted = pruned = 0
+        with self._write_lock or nullcontext():
+            # Re-check under the write lock against fresh scopes: a search that
+            # started during the scan may have claimed the book since
+            live_searches, live_sessions = self._live_scopes(set())
+            collection = self.vector_store.collection
+            for start in range(0, len(candidates), batch_size):
+                batch = collection.get(ids=candidates[start : start + batch_size], include=["metadatas"])
+                orphans, stale = _classify(batch["ids"], batch["metadatas"], live_searches, live_sessions)
+                if orphans:
+                    collection.delete(ids=orphans)
+                    if self.lexical_index is not None:
+                        self.lexical_index.remove(orphans)
+                    deleted += len(orphans)
+                if stale:
+                    # Chroma rejects None metadata values, so dead keys are
+                    # cleared to False, which membership filters never match
+                    ids = list(stale)
+                    cleared = [dict.fromkeys(stale[doc_id], False) for doc_id in ids]
+                    collection.update(ids=ids, metadatas=cleared)
+                    if self.lexical_index is not None:
+                        self.lexical_index.add(ids, [None] * len(ids), cleared)
+                    pruned += len(ids)
+        return deleted, pruned
+
+    def start(self, interval: float | None = None) -> None:
+        """Run `sweep` every interval seconds on a daemon thread (no-op if running or disabled)."""
+        interval = self.config.retention_sweep_interval_seconds if interval is None else interval
+        if not interval or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.sweep()
+                except Exception:
+                    logger.exception("Retention sweep failed")
+
+        self._thread = threading.Thread(target=_loop, name="retention-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sweeper."""
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report without deleting")
+    parser.add_argument("--compact", action="store_true", help="compact the vector index afterwards")
+    args = parser.parse_args()
+
+    config = AppConfig()
+    # Deleting needs the store to ourselves; the app's lexical index and lock live in its process
+    store = VectorStore(config, exclusive=not args.dry_run)
+    try:
+        store.collection
+    except StoreInUseError as e:
+        print(f"{e}; its background sweeper handles retention while it runs")
+        sys.exit(1)
+    manager = RetentionManager(FileManager(), store, config=config)
+    result = manager.sweep(dry_run=args.dry_run)
+    verb = "Would delete" if args.dry_run else "Deleted"
+    print(
+        f"{verb} {len(result.deleted_entries)} entries ({result.freed_bytes} bytes) "
+        f"and {result.deleted_vectors} vector entries"
+    )
+    if result.pruned_vectors:
+        print(f"Pruned stale search/session keys from {result.pruned_vectors} vector entries")
+    if args.compact and not args.dry_run and result.deleted_vectors:
+        print(f"Compacted '{config.chroma_collection_name}': {store.compact()} records")
@@ -0,0 +1,199 @@
+"""Lazily opened, persistent Chroma collection for book documents.
+
+Usage:
+    python -m utils.vector_store compact
+
+Offline maintenance (compaction, the retention CLI) opens the store
+exclusively and refuses to run while an app process has it open; stop the
+app first, or let its background sweeper do the work.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+import chromadb
+from chromadb import Embeddings
+from chromadb.api.models.Collection import Collection
+from chromadb.utils import embedding_functions
+
+from models.config import AppConfig
+from utils.embedding_cache import CachedEmbeddingFunction, EmbeddingCache
+
+_PROCESS_LOCK_FILE = ".in_use.lock"
+
+
+class StoreInUseError(RuntimeError):
+    """Raised when exclusive access is requested but another process has the store open."""
+
+
+class VectorStore:
+    """
+    Owns the Chroma client and book collection.
+
+    Nothing is opened until the collection is first used, so importing the
+    tools stays cheap. With a persist path set, embeddings survive restarts
+    and an existing index is reopened instead of rebuilt.
+
+    Opening a persistent store takes a shared inter-process lock held for
+    the life of the process; with `exclusive=True` an exclusive one is taken
+    instead, and StoreInUseError is raised if any other process has the
+    store open.
+    """
+
+    def __init__(self, config: AppConfig | None = None, exclusive: bool = False) -> None:
+        self.config = config or AppConfig()
+        self.exclusive = exclusive
+        self._lock = threading.Lock()
+        # Serializes writes (upserts, deletes, compaction) within this process
+        self.write_lock = threading.RLock()
+        self._client = None
+        self._collection: Collection | None = None
+        self._embedding_function = None
+        self._process_lock = None
+
+    def _create_embedding_function(self):
+        embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        if self.config.embedding_cache_enabled:
+            embedding_function = CachedEmbeddingFunction(
+                embedding_function,
+                EmbeddingCache(
+                    self.config.embedding_cache_path,
+                    max_entries=self.config.embedding_cache_max_entries,
+                ),
+            )
+        return embedding_function
+
+    def _lock_process(self, path: Path) -> None:
+        """Take the shared (or exclusive) inter-process lock on a persistent store."""
+        if fcntl is None:
+            if self.exclusive:
+                raise StoreInUseError(
+                    "Cannot check whether the vector store is in use on this platform"
+                )
+            return
+        handle = open(path / _PROCESS_LOCK_FILE, "a")
+        mode = fcntl.LOCK_EX | fcntl.LOCK_NB if self.exclusive else fcntl.LOCK_SH
+        try:
+            fcntl.flock(handle, mode)
+        except BlockingIOError:
+            handle.close()
+            raise StoreInUseError(
+                f"Vector store at {path} is open in another process; stop the app first"
+            ) from None
+        self._process_lock = handle
+
+    def _create_client(self):
+        if self.config.chroma_persist_path:
+            path = Path(self.config.chroma_persist_path)
+            path.mkdir(parents=True, exist_ok=True)
+            self._lock_process(path)
+            return chromadb.PersistentClient(path=str(path))
+        return chromadb.Client()
+
+    @property
+    def collection(self) -> Collection:
+        """The book collection, opened (or created) on first access."""
+        if self._collection is not None:
+            return self._collection
+        with self._lock:
+            if self._collection is None:
+                self._client = self._create_client()
+                self._embedding_function = self._create_embedding_function()
+                self._collection = self._client.get_or_create_collection(
+                    self.config.chroma_collection_name,
+                    embedding_function=self._embedding_function,
+                )
+            return self._collection
+
+    def embed_queries(self, queries: list[str]) -> Embeddings:
+        """
+        Embed query texts with the collection's model, bypassing the embedding cache.
+
+        Queries are rarely repeated, so caching them would only evict document vectors.
+        """
+        self.collection
+        embedding_function = self._embedding_function
+        if isinstance(embedding_function, CachedEmbeddingFunction):
+            embedding_function = embedding_function.uncached
+        return embedding_function(queries)
+
+    def warm_up(self, background: bool = True) -> None:
+        """Open the collection ahead of the first query, optionally on a background thread."""
+
+        def _open() -> None:
+            self.collection.count()
+
+        if background:
+            threading.Thread(target=_open, daemon=True).start()
+        else:
+            _open()
+
+    def compact(self, batch_size: int = 1000) -> int:
+        """
+        Rebuild the collection from its stored embeddings.
+
+        Chroma's HNSW index keeps space for deleted and updated entries; copying
+        live records into a fresh collection reclaims it without re-embedding.
+
+        Writes in this process wait on `write_lock` until the copy is swapped
+        in. Callers must fetch `collection` per operation (under `write_lock`
+        for writes) rather than keep a handle, since the old one is deleted.
+
+        Returns:
+            Number of records in the compacted collection
+        """
+        name = self.config.chroma_collection_name
+        tmp_name = f"{name}__compact"
+
+        self.collection  # open the store before taking the locks
+        with self.write_lock, self._lock:
+            source = self._collection
+            try:
+                self._client.delete_collection(tmp_name)
+            except ValueError:
+                pass
+            target = self._client.create_collection(
+                tmp_name,
+                embedding_function=self._embedding_function,
+                metadata=source.metadata,
+            )
+
+            offset = 0
+            while True:
+                batch = source.get(
+                    include=["embeddings", "documents", "metadatas"],
+                    limit=batch_size,
+                    offset=offset,
+                )
+                if not batch["ids"]:
+                    break
+                target.add(
+                    ids=batch["ids"],
+                    embeddings=batch["embeddings"],
+                    documents=batch["documents"],
+                    metadatas=batch["metadatas"],
+                )
+                offset += len(batch["ids"])
+
+            self._client.delete_collection(name)
+            target.modify(name=name)
+            self._collection = target
+            return target.count()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["compact"]:
+        print("Usage: python -m utils.vector_store compact")
+        sys.exit(1)
+    store = VectorStore(exclusive=True)
+    try:
+        print(f"Compacted '{store.config.chroma_collection_name}': {store.compact()} records")
+    except StoreInUseError as e:
+        print(e)
+        sys.exit(1)